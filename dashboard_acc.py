@@ -9,13 +9,17 @@ import streamlit as st
 import sqlite3
 import json
 import pandas as pd
+import numpy as np
 import os
+import re
+import base64
+import logging
 import requests
 from datetime import datetime, timedelta, date
+from functools import lru_cache
+from collections import Counter
 from zoneinfo import ZoneInfo
 from pathlib import Path
-import plotly.express as px
-import plotly.graph_objects as go
 from typing import Optional, Dict, List, Tuple
 
 # Configurazione pagina
@@ -26,6 +30,1049 @@ st.set_page_config(
     initial_sidebar_state="expanded"
 )
 
+# Tipi sessione ACC -> etichetta compatta
+SESSION_TYPE_MAP = {
+    'R1': 'Gara', 'R2': 'Gara', 'R3': 'Gara', 'R4': 'Gara', 'R5': 'Gara',
+    'R6': 'Gara', 'R7': 'Gara', 'R8': 'Gara', 'R9': 'Gara', 'R': 'Gara',
+    'Q1': 'Qualifiche', 'Q2': 'Qualifiche', 'Q3': 'Qualifiche', 'Q4': 'Qualifiche',
+    'Q5': 'Qualifiche', 'Q6': 'Qualifiche', 'Q7': 'Qualifiche', 'Q8': 'Qualifiche',
+    'Q9': 'Qualifiche', 'Q': 'Qualifiche',
+    'FP1': 'Prove', 'FP2': 'Prove', 'FP3': 'Prove', 'FP4': 'Prove', 'FP5': 'Prove',
+    'FP6': 'Prove', 'FP7': 'Prove', 'FP8': 'Prove', 'FP9': 'Prove', 'FP': 'Prove'
+}
+
+# Medaglie per le prime tre posizioni delle classifiche
+POSITION_MEDALS = {1: "🥇", 2: "🥈", 3: "🥉"}
+POSITION_MEDAL_LOOKUP = np.array(["", *POSITION_MEDALS.values()], dtype=object)  # indice = posizione
+
+# Date ISO come salvate nel database (YYYY-MM-DD / YYYY-MM-DDTHH:MM...)
+ISO_DATE_RE = re.compile(r'\d{4}-\d{2}-\d{2}')
+ISO_DATETIME_RE = re.compile(r'\d{4}-\d{2}-\d{2}[T ]\d{2}:\d{2}')
+
+# Oltre questa soglia di punti i grafici a linee passano da SVG (Scatter) a WebGL (Scattergl)
+SCATTERGL_MIN_POINTS = 1000
+
+# DDL degli indici attesi nel database, applicato dal job di sincronizzazione (il dashboard lo legge soltanto)
+INDEXES_SQL_PATH = Path(__file__).resolve().parent / "schema" / "indexes.sql"
+
+
+def minify_css(css: str) -> str:
+    """Rimuove commenti e spazi superflui da un blocco <style> (eseguito una volta all'import)"""
+    css = re.sub(r'/\*.*?\*/', '', css, flags=re.DOTALL)
+    css = re.sub(r'\s+', ' ', css)
+    return re.sub(r'\s*([{};,>])\s*', r'\1', css).strip()
+
+
+# CSS personalizzato con miglioramenti per mobile
+CUSTOM_CSS = minify_css("""
+<style>
+/* CSS esistente + miglioramenti */
+.main-header {
+    text-align: center;
+    padding: 2rem 0;
+    background: linear-gradient(90deg, #1f4e79, #2d5a87);
+    color: white;
+    border-radius: 10px;
+    margin-bottom: 2rem;
+}
+
+.metric-card {
+    background: white;
+    padding: 1.5rem;
+    border-radius: 10px;
+    box-shadow: 0 2px 4px rgba(0,0,0,0.1);
+    border-left: 4px solid #1f4e79;
+    margin-bottom: 1rem;
+}
+
+.metric-value {
+    font-size: 2.5rem;
+    font-weight: bold;
+    color: #1f4e79;
+    margin: 0;
+}
+
+.metric-label {
+    font-size: 1.1rem;
+    color: #666;
+    margin: 0;
+}
+
+.metric-grid {
+    display: grid;
+    grid-template-columns: repeat(4, 1fr);
+    column-gap: 1rem;
+}
+
+.championship-header {
+    background: linear-gradient(135deg, #2d2d2d, #1e1e1e);
+    color: white;
+    padding: 1rem;
+    border-radius: 8px;
+    text-align: center;
+    margin: 1rem 0;
+}
+
+.competition-header {
+    background: linear-gradient(135deg, #3d3d3d, #2a2a2a);
+    color: white;
+    padding: 0.8rem;
+    border-radius: 6px;
+    text-align: center;
+    margin: 1rem 0;
+}
+
+.session-header {
+    background: #f0f2f6;
+    padding: 0.5rem 1rem;
+    border-radius: 4px;
+    border-left: 3px solid #1f4e79;
+    margin: 0.5rem 0;
+}
+
+.environment-indicator {
+    position: fixed;
+    top: 10px;
+    right: 10px;
+    background: rgba(0,0,0,0.7);
+    color: white;
+    padding: 0.3rem 0.8rem;
+    border-radius: 15px;
+    font-size: 0.8rem;
+    z-index: 1000;
+}
+
+.github-badge {
+    background: #24292e;
+    color: white;
+}
+
+.local-badge {
+    background: #28a745;
+    color: white;
+}
+
+.fun-header {
+    background: linear-gradient(90deg, #28a745, #20c997);
+    color: white;
+    padding: 1rem;
+    border-radius: 8px;
+    text-align: center;
+    margin: 1rem 0;
+}
+
+.social-buttons button:hover {
+    transform: translateY(-2px);
+    box-shadow: 0 6px 12px rgba(0,0,0,0.3) !important;
+    transition: all 0.3s ease;
+}
+
+/* Responsive improvements */
+@media (max-width: 768px) {
+    .metric-value {
+        font-size: 2rem;
+    }
+
+    .main-header h1 {
+        font-size: 1.8rem;
+    }
+
+    .main-header h3 {
+        font-size: 1.2rem;
+    }
+}
+
+/* Banner community: testo ridotto su mobile (override degli stili inline) */
+@media (max-width: 768px) {
+    .community-banner h1 {
+        font-size: 2rem !important;
+    }
+
+    .community-banner h3 {
+        font-size: 1.2rem !important;
+    }
+}
+
+@media (max-width: 640px) {
+    .metric-grid {
+        grid-template-columns: 1fr;
+    }
+}
+
+/* Fix per tabelle su mobile */
+.dataframe {
+    font-size: 0.9rem;
+}
+
+@media (max-width: 768px) {
+    .dataframe {
+        font-size: 0.8rem;
+    }
+}
+</style>
+""")
+
+
+# ==================== CACHE DATI ====================
+# I parametri con "_" iniziale sono esclusi dalla chiave di cache di Streamlit:
+# la cache si invalida per TTL o quando cambia la data di modifica del database.
+
+@st.cache_data(show_spinner=False)
+def load_config_file(config_file: str, config_mtime: float) -> dict:
+    """Legge un file di configurazione JSON (riletto solo se cambia la data di modifica)"""
+    with open(config_file, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+@st.cache_data(show_spinner=False)
+def load_banner_base64(banner_path: str, banner_mtime: float) -> str:
+    """Banner codificato in base64, riletto solo se il file cambia"""
+    return base64.b64encode(Path(banner_path).read_bytes()).decode()
+
+
+@st.cache_data(show_spinner=False)
+def build_social_buttons_html(discord_url: Optional[str], simgrid_url: Optional[str]) -> str:
+    """HTML dei pulsanti social del banner (stringa vuota se nessun link è configurato)"""
+    button_style = (
+        "background: linear-gradient(90deg, #5865f2, #7289da); color: white; border: none; "
+        "padding: 0.8rem 1.5rem; border-radius: 25px; font-weight: bold; cursor: pointer; "
+        "box-shadow: 0 4px 8px rgba(0,0,0,0.2);"
+    )
+    
+    social_buttons = []
+    if simgrid_url:
+        social_buttons.append(f'<a href="{simgrid_url}" target="_blank" style="text-decoration: none; margin: 0 1rem;"><button style="{button_style}">🏆 SimGrid Community</button></a>')
+    if discord_url:
+        social_buttons.append(f'<a href="{discord_url}" target="_blank" style="text-decoration: none; margin: 0 1rem;"><button style="{button_style}">💬 Join Discord</button></a>')
+    
+    if not social_buttons:
+        return ""
+    return f'<div style="text-align: center; margin: 1rem 0;">{"".join(social_buttons)}</div>'
+
+
+@st.cache_resource(max_entries=1, show_spinner=False)
+def get_shared_connection(db_path: str, db_mtime: float) -> sqlite3.Connection:
+    """Connessione SQLite in sola lettura condivisa da tutte le sessioni (riaperta se il file cambia)
+
+    Solo query senza stato: niente tabelle temporanee o altre modifiche alla
+    connessione, che sarebbero visibili (e distruttibili) dalle altre sessioni.
+    """
+    uri = f"{Path(db_path).resolve().as_uri()}?mode=ro"
+    conn = sqlite3.connect(
+        uri, uri=True, check_same_thread=False, isolation_level=None
+    )
+    
+    # Solo PRAGMA di connessione: il file del database non viene modificato (niente WAL)
+    conn.execute("PRAGMA mmap_size = 268435456")  # 256 MB
+    conn.execute("PRAGMA cache_size = -65536")    # 64 MB
+    conn.execute("PRAGMA temp_store = MEMORY")
+    return conn
+
+
+@st.cache_resource(max_entries=1, show_spinner=False)
+def check_indexes(_conn: sqlite3.Connection, db_path: str, db_mtime: float) -> List[str]:
+    """Indici di schema/indexes.sql assenti dal database, segnalati nel log una volta per versione del file
+
+    Solo lettura di sqlite_master: gli indici li crea il job di sincronizzazione,
+    senza indici le query funzionano comunque (più lente).
+    """
+    try:
+        expected = re.findall(r'CREATE INDEX IF NOT EXISTS (\w+)', INDEXES_SQL_PATH.read_text(encoding='utf-8'))
+        existing = {row[0] for row in _conn.execute("SELECT name FROM sqlite_master WHERE type = 'index'")}
+    except (OSError, sqlite3.Error):
+        return []
+
+    missing = [name for name in expected if name not in existing]
+    if missing:
+        logging.getLogger(__name__).warning(
+            "Indici mancanti in %s (applicare schema/indexes.sql): %s", db_path, ", ".join(missing)
+        )
+    return missing
+
+
+def fetch_dataframe(conn: sqlite3.Connection, query: str, params: List) -> pd.DataFrame:
+    """DataFrame da cursore per le query a forma fissa (senza il layer generico di read_sql_query)"""
+    cursor = conn.execute(query, params)
+    columns = [col[0] for col in cursor.description]
+    return pd.DataFrame.from_records(cursor.fetchall(), columns=columns, coerce_float=True)
+
+
+def format_date_strings(values: List[str], input_format: str, output_format: str = '%d/%m/%Y') -> List[str]:
+    """Converte in blocco date testuali nel formato input_format; i valori non validi restano invariati"""
+    raw = pd.Series(values, dtype=object)
+    parsed = pd.to_datetime(raw.fillna(""), format=input_format, errors='coerce', cache=True)
+    return parsed.dt.strftime(output_format).where(parsed.notna(), raw).tolist()
+
+
+@st.cache_data(ttl=600, show_spinner=False)
+def load_tracks_list(_conn: sqlite3.Connection, db_path: str, db_mtime: float) -> List[str]:
+    """Lista piste presenti nelle sessioni (scan sull'indice idx_track_name)"""
+    cursor = _conn.cursor()
+    cursor.execute('SELECT DISTINCT track_name FROM sessions ORDER BY track_name')
+    return [row[0] for row in cursor.fetchall()]
+
+
+@st.cache_data(ttl=300, show_spinner=False)
+def load_drivers_list(_conn: sqlite3.Connection, db_path: str, db_mtime: float) -> List[Dict]:
+    """Piloti TFL con almeno un giro registrato, in ordine alfabetico"""
+    # row_factory sul cursore: la connessione è condivisa con le altre query
+    cursor = _conn.cursor()
+    cursor.row_factory = sqlite3.Row
+    
+    query = '''
+        SELECT DISTINCT d.driver_id, d.last_name, d.short_name
+        FROM drivers d
+        WHERE d.trust_level > 0
+        AND EXISTS (
+            SELECT 1 FROM laps l WHERE l.driver_id = d.driver_id
+        )
+        ORDER BY LOWER(d.last_name)
+    '''
+    return [dict(row) for row in cursor.execute(query)]
+
+
+@st.cache_data(ttl=300, show_spinner=False)
+def load_all_drivers_summary(_conn: sqlite3.Connection, db_path: str, db_mtime: float) -> pd.DataFrame:
+    """Riepilogo di tutti i piloti: titoli, vittorie, pole, podi e record"""
+    query = '''
+        WITH track_bests AS (
+            -- Record di ogni pista, calcolato una sola volta
+            SELECT s.track_name, MIN(l.lap_time) as best
+            FROM laps l
+            JOIN sessions s ON l.session_id = s.session_id
+            WHERE l.is_valid_for_best = 1 AND l.lap_time > 0
+            GROUP BY s.track_name
+        )
+        SELECT 
+            d.driver_id,
+            d.last_name as driver_name,
+            d.preferred_race_number as number,
+            COALESCE(champ.championships, 0) as championships,
+            COALESCE(champ.wins, 0) as wins,
+            COALESCE(champ.poles, 0) as poles,
+            COALESCE(champ.podiums, 0) as podiums,
+            COALESCE(records.records, 0) as records
+        FROM drivers d
+        LEFT JOIN (
+            -- Statistiche da championship_standings
+            SELECT 
+                driver_id,
+                SUM(CASE WHEN position = 1 THEN 1 ELSE 0 END) as championships,
+                SUM(wins) as wins,
+                SUM(poles) as poles,
+                SUM(podiums) as podiums
+            FROM championship_standings 
+            GROUP BY driver_id
+        ) champ ON d.driver_id = champ.driver_id
+        LEFT JOIN (
+            -- Conteggio record ufficiali detenuti
+            SELECT 
+                l.driver_id,
+                COUNT(DISTINCT s.track_name) as records
+            FROM laps l
+            JOIN sessions s ON l.session_id = s.session_id
+            JOIN track_bests tb ON tb.track_name = s.track_name AND l.lap_time = tb.best
+            WHERE l.is_valid_for_best = 1 AND l.lap_time > 0
+            GROUP BY l.driver_id
+        ) records ON d.driver_id = records.driver_id
+        WHERE d.trust_level > 0
+        AND EXISTS (
+            SELECT 1 FROM laps l WHERE l.driver_id = d.driver_id
+        )
+        ORDER BY LOWER(d.last_name)
+    '''
+    
+    # Colonne Arrow: niente object dtype e serializzazione diretta verso st.dataframe
+    return pd.read_sql_query(query, _conn, dtype_backend="pyarrow")
+
+
+@st.cache_data(ttl=300, show_spinner=False)
+def load_driver_statistics_map(_conn: sqlite3.Connection, db_path: str, db_mtime: float) -> Dict[int, Dict]:
+    """Statistiche di tutti i piloti con giri registrati, indicizzate per driver_id (una sola query)"""
+    query = '''
+        WITH base AS (
+            -- Statistiche base
+            SELECT 
+                l.driver_id,
+                COUNT(DISTINCT l.session_id) as total_sessions,
+                COUNT(DISTINCT CASE WHEN s.competition_id IS NOT NULL THEN l.session_id END) as official_sessions,
+                COUNT(DISTINCT s.track_name) as num_tracks
+            FROM laps l
+            JOIN sessions s ON l.session_id = s.session_id
+            GROUP BY l.driver_id
+        ),
+        results AS (
+            -- Risultati gare (wins, poles, podiums, championships) da championship_standings
+            SELECT 
+                driver_id,
+                SUM(wins) as wins,
+                SUM(poles) as poles,
+                SUM(podiums) as podiums,
+                SUM(CASE WHEN position = 1 THEN 1 ELSE 0 END) as championships
+            FROM championship_standings
+            GROUP BY driver_id
+        )
+        SELECT
+            d.driver_id,
+            base.total_sessions,
+            base.official_sessions,
+            base.num_tracks,
+            d.trust_level,
+            results.wins,
+            results.poles,
+            results.podiums,
+            results.championships,
+            d.bad_driver_reports
+        FROM drivers d
+        JOIN base ON base.driver_id = d.driver_id
+        LEFT JOIN results ON results.driver_id = d.driver_id
+    '''
+    
+    stats_map = {}
+    for driver_id, sessions, official, tracks, trust_level, wins, poles, podiums, championships, bad_reports in _conn.execute(query):
+        stats_map[driver_id] = {
+            'total_sessions': sessions or 0,
+            'official_sessions': official or 0,
+            'num_tracks': tracks or 0,
+            'trust_level': trust_level if trust_level is not None else 'N/A',
+            'wins': wins or 0,
+            'poles': poles or 0,
+            'podiums': podiums or 0,
+            'championships': championships or 0,
+            'bad_reports': bad_reports or 0
+        }
+    
+    return stats_map
+
+
+@st.cache_data(ttl=300, show_spinner=False)
+def load_database_stats(_conn: sqlite3.Connection, db_path: str, db_mtime: float) -> Dict:
+    """Statistiche generali per la homepage (ricalcolate solo se il database cambia)"""
+    cursor = _conn.cursor()
+    
+    # Conteggi e ultima gara di campionato in un solo round trip (scalar subquery)
+    cursor.execute('''
+        SELECT
+            (SELECT COUNT(*) FROM drivers WHERE trust_level > 0),
+            (SELECT COUNT(*) FROM drivers WHERE trust_level = 0),
+            (SELECT COUNT(*) FROM leagues),
+            (SELECT COUNT(*) FROM sessions),
+            (SELECT COUNT(*) FROM laps WHERE is_valid_for_best = 1),
+            (SELECT MAX(date_start) FROM competitions
+             WHERE championship_id IS NOT NULL AND is_completed = 1)
+    ''')
+    keys = ('total_drivers', 'guest_drivers', 'total_leagues', 'total_sessions',
+            'total_valid_laps', 'last_championship_race')
+    stats = dict(zip(keys, cursor.fetchone()))
+    
+    # Detentore del titolo - pilota vincitore dell'ultimo campionato completato
+    try:
+        cursor.execute('''
+            SELECT d.last_name 
+            FROM championship_standings cs
+            JOIN drivers d ON cs.driver_id = d.driver_id
+            JOIN championships ch ON cs.championship_id = ch.championship_id
+            WHERE cs.position = 1 AND ch.is_completed = 1
+            ORDER BY ch.end_date DESC
+            LIMIT 1
+        ''')
+        result = cursor.fetchone()
+        stats['title_holder'] = result[0] if result else None
+    except Exception:
+        stats['title_holder'] = None
+    
+    # Prossima competizione prevista
+    try:
+        cursor.execute('''
+            SELECT c.name, c.date_start, c.track_name, ch.name as championship_name
+            FROM competitions c
+            LEFT JOIN championships ch ON c.championship_id = ch.championship_id
+            WHERE c.is_completed = 0 AND c.date_start IS NOT NULL
+            ORDER BY c.date_start ASC
+            LIMIT 1
+        ''')
+        result = cursor.fetchone()
+        if result:
+            stats['next_competition'] = {
+                'name': result[0],
+                'date': result[1],
+                'track': result[2],
+                'championship': result[3]
+            }
+        else:
+            stats['next_competition'] = None
+    except Exception:
+        stats['next_competition'] = None
+    
+    return stats
+
+
+@st.cache_data(ttl=300, show_spinner=False)
+def load_session_results(_conn: sqlite3.Connection, db_path: str, db_mtime: float, session_id: str) -> pd.DataFrame:
+    """Risultati di una sessione (classificati prima, poi senza posizione)"""
+    query = """
+        SELECT
+            sr.position,
+            sr.race_number,
+            d.last_name as driver,
+            COALESCE(cm.car_name, sr.car_model) as car,
+            sr.lap_count,
+            sr.best_lap,
+            sr.total_time,
+            sr.is_spectator,
+            d.trust_level
+        FROM session_results sr
+        JOIN drivers d ON sr.driver_id = d.driver_id
+        LEFT JOIN car_models cm ON sr.car_model = cm.car_model
+        WHERE sr.session_id = ?
+        ORDER BY
+            CASE WHEN sr.position IS NULL THEN 1 ELSE 0 END,
+            sr.position
+    """
+    
+    return fetch_dataframe(_conn, query, [session_id])
+
+
+@st.cache_data(ttl=300, show_spinner=False)
+def load_sessions_results(_conn: sqlite3.Connection, db_path: str, db_mtime: float, session_ids: Tuple[str, ...]) -> pd.DataFrame:
+    """Risultati di più sessioni in una sola query (stesso ordinamento di load_session_results)"""
+    placeholders = ','.join('?' * len(session_ids))
+    query = f"""
+        SELECT
+            sr.session_id,
+            sr.position,
+            sr.race_number,
+            d.last_name as driver,
+            COALESCE(cm.car_name, sr.car_model) as car,
+            sr.lap_count,
+            sr.best_lap,
+            sr.total_time,
+            sr.is_spectator,
+            d.trust_level
+        FROM session_results sr
+        JOIN drivers d ON sr.driver_id = d.driver_id
+        LEFT JOIN car_models cm ON sr.car_model = cm.car_model
+        WHERE sr.session_id IN ({placeholders})
+        ORDER BY
+            sr.session_id,
+            CASE WHEN sr.position IS NULL THEN 1 ELSE 0 END,
+            sr.position
+    """
+    
+    return fetch_dataframe(_conn, query, list(session_ids))
+
+
+@st.cache_data(ttl=300, show_spinner=False)
+def load_competition_results(_conn: sqlite3.Connection, db_path: str, db_mtime: float, competition_id: int) -> pd.DataFrame:
+    """Classifica di una competizione per i soli piloti TFL"""
+    query = """
+        SELECT
+            d.last_name as driver,
+            cs.race_points,
+            cs.pole_points,
+            cs.fastest_lap_points,
+            cs.time_attack_points,
+            cs.points_bonus,
+            cs.points_dropped,
+            cs.total_points,
+            cs.guests_beaten,
+            cs.beaten_by_guests,
+            d.trust_level
+        FROM competition_standings cs
+        JOIN drivers d ON cs.driver_id = d.driver_id
+        WHERE cs.competition_id = ?
+            AND d.trust_level > 0
+        ORDER BY cs.total_points DESC,
+                 cs.race_points DESC
+    """
+    
+    return fetch_dataframe(_conn, query, [competition_id])
+
+
+@st.cache_data(ttl=300, show_spinner=False)
+def load_competition_sessions(_conn: sqlite3.Connection, db_path: str, db_mtime: float, competition_id: int) -> List[Tuple]:
+    """Sessioni di una competizione con il pilota autore del best lap"""
+    # Un solo pilota per sessione: a parità di best lap vale il meglio classificato
+    query = """
+        WITH comp_sessions AS (
+            SELECT session_id, session_type, session_date, session_order, total_drivers, best_lap_overall
+            FROM sessions
+            WHERE competition_id = ?
+                AND (is_time_attack IS NULL OR is_time_attack = 0)
+        ),
+        best_lap_drivers AS (
+            SELECT
+                sr.session_id,
+                sr.driver_id,
+                ROW_NUMBER() OVER (
+                    PARTITION BY sr.session_id
+                    ORDER BY sr.position IS NULL, sr.position
+                ) as rn
+            -- CROSS JOIN fissa l'ordine: si parte dalle poche sessioni della competizione
+            FROM comp_sessions cs
+            CROSS JOIN session_results sr ON sr.session_id = cs.session_id
+                AND sr.best_lap = cs.best_lap_overall
+            WHERE sr.is_spectator = FALSE
+        )
+        SELECT
+            cs.session_id,
+            cs.session_type,
+            cs.session_date,
+            cs.session_order,
+            cs.total_drivers,
+            cs.best_lap_overall,
+            d.last_name as best_lap_driver
+        FROM comp_sessions cs
+        LEFT JOIN best_lap_drivers bld ON bld.session_id = cs.session_id AND bld.rn = 1
+        LEFT JOIN drivers d ON bld.driver_id = d.driver_id
+        ORDER BY cs.session_order, cs.session_date
+    """
+    
+    return _conn.execute(query, (competition_id,)).fetchall()
+
+
+@st.cache_data(ttl=300, show_spinner=False)
+def load_championship_standings(_conn: sqlite3.Connection, db_path: str, db_mtime: float, championship_id: int) -> pd.DataFrame:
+    """Classifica di un campionato con penalità manuali attive"""
+    query = """
+        SELECT
+            cs.position,
+            d.last_name as driver,
+            cs.total_points,
+            cs.competitions_participated,
+            cs.wins,
+            cs.podiums,
+            cs.poles,
+            cs.fastest_laps,
+            cs.gross_points,
+            cs.points_dropped,
+            cs.base_points,
+            cs.participation_multiplier,
+            cs.participation_bonus,
+            COALESCE(SUM(CASE WHEN mp.is_active = 1 THEN mp.penalty_points ELSE 0 END), 0) as manual_penalties
+        FROM championship_standings cs
+        JOIN drivers d ON cs.driver_id = d.driver_id
+        LEFT JOIN manual_penalties mp ON cs.championship_id = mp.championship_id
+            AND cs.driver_id = mp.driver_id AND mp.is_active = 1
+        WHERE cs.championship_id = ?
+        GROUP BY cs.championship_id, cs.driver_id, cs.position, d.last_name,
+                 cs.total_points, cs.competitions_participated, cs.wins, cs.podiums,
+                 cs.poles, cs.fastest_laps, cs.gross_points, cs.points_dropped,
+                 cs.base_points, cs.participation_multiplier, cs.participation_bonus
+        ORDER BY cs.position
+    """
+    
+    return fetch_dataframe(_conn, query, [championship_id])
+
+
+@st.cache_data(ttl=300, show_spinner=False)
+def load_leagues_list(_conn: sqlite3.Connection, db_path: str, db_mtime: float) -> List[Tuple]:
+    """Leagues con numero di piloti in classifica, più recenti prima"""
+    query = """
+        SELECT
+            l.league_id,
+            l.name,
+            l.season,
+            l.start_date,
+            l.end_date,
+            l.total_tiers,
+            l.is_completed,
+            l.description,
+            COUNT(ls.driver_id) as standings_count
+        FROM leagues l
+        LEFT JOIN league_standings ls ON l.league_id = ls.league_id
+        GROUP BY l.league_id
+        ORDER BY
+            CASE WHEN l.start_date IS NULL THEN 1 ELSE 0 END,
+            l.start_date DESC,
+            l.league_id DESC
+    """
+    
+    return _conn.execute(query).fetchall()
+
+
+@st.cache_data(ttl=300, show_spinner=False)
+def load_league_standings(_conn: sqlite3.Connection, db_path: str, db_mtime: float, league_id: int) -> pd.DataFrame:
+    """Classifica finale di una league"""
+    query = """
+        SELECT
+            ls.position,
+            d.last_name as driver,
+            ls.tier1_points,
+            ls.tier2_points,
+            ls.tier3_points,
+            ls.tier4_points,
+            ls.total_final_points,
+            ls.consistency_cv,
+            ls.consistency_bonus,
+            ls.tiers_participated,
+            ls.total_wins,
+            ls.total_podiums,
+            ls.total_poles,
+            ls.total_fastest_laps
+        FROM league_standings ls
+        JOIN drivers d ON ls.driver_id = d.driver_id
+        WHERE ls.league_id = ?
+        ORDER BY ls.position ASC
+    """
+    
+    return fetch_dataframe(_conn, query, [league_id])
+
+
+@st.cache_data(ttl=300, show_spinner=False)
+def load_tier_championships(_conn: sqlite3.Connection, db_path: str, db_mtime: float, league_id: int) -> List[Tuple]:
+    """Championship (tier) di una league con numero di piloti in classifica, scarti e round totali"""
+    query = """
+        SELECT
+            c.championship_id,
+            c.name,
+            c.tier_number,
+            c.start_date,
+            c.end_date,
+            c.is_completed,
+            c.description,
+            COUNT(cs.driver_id) as standings_count,
+            -- Scarti e round per il calcolo delle gare conteggiate (nessuna query alla selezione del tier)
+            (
+                SELECT COALESCE(ps.drop_worst_results, 0)
+                FROM competitions comp
+                LEFT JOIN points_systems ps ON comp.points_system_json = ps.name
+                WHERE comp.championship_id = c.championship_id
+                LIMIT 1
+            ) as drop_worst,
+            CASE WHEN EXISTS (
+                SELECT 1 FROM competitions comp WHERE comp.championship_id = c.championship_id
+            ) THEN c.total_rounds END as total_rounds
+        FROM championships c
+        LEFT JOIN championship_standings cs ON c.championship_id = cs.championship_id
+        WHERE c.league_id = ? AND c.championship_type = 'tier'
+        GROUP BY c.championship_id
+        ORDER BY
+            CASE WHEN c.start_date IS NULL THEN 1 ELSE 0 END,
+            c.start_date DESC,
+            c.championship_id DESC
+    """
+    
+    return _conn.execute(query, (league_id,)).fetchall()
+
+
+@st.cache_data(ttl=300, show_spinner=False)
+def load_league_competition_end_dates(_conn: sqlite3.Connection, db_path: str, db_mtime: float, league_id: int) -> List[Tuple]:
+    """Date di fine delle competizioni di una league (linee verticali del trend partecipanti)"""
+    query = """
+        SELECT DISTINCT c.date_end, c.name
+        FROM competitions c
+        WHERE c.championship_id IN (
+            SELECT championship_id
+            FROM championships
+            WHERE league_id = ?
+        )
+        AND c.date_end IS NOT NULL
+        ORDER BY c.date_end ASC
+    """
+    
+    return _conn.execute(query, (league_id,)).fetchall()
+
+
+@st.cache_data(ttl=300, show_spinner=False)
+def load_league_participation_trend(_conn: sqlite3.Connection, db_path: str, db_mtime: float, league_id: int) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Partecipanti unici per giorno di una league, già pronti per il grafico: (date, registrati, guest)"""
+    # Query per contare partecipanti unici per giorno (separati per registrati e guest):
+    # sessioni della league con il loro giorno in una CTE, poi deduplica (giorno, pilota) e conteggio
+    query = """
+        WITH league_sessions AS (
+            -- Giorno dalla colonna session_date (ISO), calcolato una volta per sessione e non dal nome file
+            SELECT s.session_id, DATE(s.session_date) as date_str
+            FROM championships ch
+            JOIN competitions c ON c.championship_id = ch.championship_id
+            JOIN sessions s ON s.competition_id = c.competition_id
+            WHERE ch.league_id = ?
+        )
+        SELECT
+            date_str,
+            SUM(CASE WHEN trust_level > 0 THEN 1 ELSE 0 END) as registered_participants,
+            SUM(CASE WHEN trust_level = 0 THEN 1 ELSE 0 END) as guest_participants
+        FROM (
+            -- Una riga per pilota e giorno: il conteggio esterno non richiede DISTINCT
+            SELECT
+                ls.date_str,
+                sr.driver_id,
+                d.trust_level
+            FROM league_sessions ls
+            JOIN session_results sr ON sr.session_id = ls.session_id
+            JOIN drivers d ON d.driver_id = sr.driver_id
+            GROUP BY ls.date_str, sr.driver_id
+        )
+        GROUP BY date_str
+        ORDER BY date_str ASC
+    """
+    
+    rows = _conn.execute(query, (league_id,)).fetchall()
+    
+    # Array NumPy tipizzati: Plotly li serializza in blocco senza controllare ogni elemento
+    # YYYY-MM-DD -> dd/mm/YYYY in un solo passaggio
+    dates = np.asarray(format_date_strings([row[0] for row in rows], "%Y-%m-%d"), dtype=object)
+    registered = np.array([reg_count if reg_count else 0 for _, reg_count, _ in rows], dtype=np.int64)
+    guests = np.array([guest_count if guest_count else 0 for _, _, guest_count in rows], dtype=np.int64)
+    
+    return dates, registered, guests
+
+
+@st.cache_data(ttl=300, show_spinner=False)
+def load_sessions_statistics(_conn: sqlite3.Connection, db_path: str, db_mtime: float, date_from_str: str, date_to_str: str) -> Dict:
+    """Statistiche sessioni nel periodo [date_from_str, date_to_str): i rerun con lo stesso periodo non rifanno le query"""
+    cursor = _conn.cursor()
+    
+    # Statistiche sessioni separate dai driver
+    # 1. Statistiche sessioni (senza JOIN con session_results)
+    cursor.execute('''
+        SELECT 
+            COUNT(*) as total_sessions,
+            COUNT(CASE WHEN competition_id IS NOT NULL THEN 1 END) as official_sessions,
+            COUNT(CASE WHEN competition_id IS NULL THEN 1 END) as non_official_sessions
+        FROM sessions s
+        WHERE DATE(s.session_date) >= ? AND DATE(s.session_date) < ?
+    ''', (date_from_str, date_to_str))
+    
+    session_result = cursor.fetchone()
+    total_sessions, official, non_official = session_result
+    
+    # 2. Piloti unici separatamente
+    cursor.execute('''
+        SELECT 
+            COUNT(DISTINCT sr.driver_id) as unique_drivers
+        FROM sessions s
+        JOIN session_results sr ON s.session_id = sr.session_id
+        WHERE DATE(s.session_date) >= ? AND DATE(s.session_date) < ?
+    ''', (date_from_str, date_to_str))
+    
+    driver_result = cursor.fetchone()
+    unique_drivers = driver_result[0] if driver_result else 0
+    
+    # Circuito con più sessioni (rimane invariato)
+    cursor.execute('''
+        SELECT 
+            track_name,
+            COUNT(*) as session_count
+        FROM sessions s
+        WHERE DATE(s.session_date) >= ? AND DATE(s.session_date) < ?
+        GROUP BY track_name
+        ORDER BY session_count DESC
+        LIMIT 1
+    ''', (date_from_str, date_to_str))
+    
+    track_result = cursor.fetchone()
+    most_used_track = track_result[0] if track_result else "N/A"
+    most_used_count = track_result[1] if track_result else 0
+    
+    # Ultima sessione (rimane invariato)
+    cursor.execute('''
+        SELECT 
+            track_name,
+            session_date,
+            session_type
+        FROM sessions s
+        WHERE DATE(s.session_date) >= ? AND DATE(s.session_date) < ?
+        ORDER BY s.session_date DESC
+        LIMIT 1
+    ''', (date_from_str, date_to_str))
+    
+    last_result = cursor.fetchone()
+    
+    return {
+        'total_sessions': total_sessions or 0,
+        'unique_drivers': unique_drivers or 0,
+        'official_sessions': official or 0,
+        'non_official_sessions': non_official or 0,
+        'most_used_track': most_used_track,
+        'most_used_count': most_used_count,
+        'last_session_track': last_result[0] if last_result else "N/A",
+        'last_session_date': last_result[1] if last_result else None,
+        'last_session_type': last_result[2] if last_result else "N/A"
+    }
+
+
+@st.cache_data(ttl=300, show_spinner=False)
+def load_sessions_list(_conn: sqlite3.Connection, db_path: str, db_mtime: float, date_from_str: str, date_to_str: str) -> pd.DataFrame:
+    """Sessioni del periodo [date_from_str, date_to_str) con best lap e competizione, dalla più recente"""
+    query = '''
+        SELECT
+            s.session_id,
+            s.session_type,
+            s.track_name,
+            s.session_date,
+            -- Data e ora già formattate da SQLite (il fuso eventuale viene ignorato, come in format_session_datetime)
+            COALESCE(
+                strftime('%d/%m/%Y %H:%M', SUBSTR(s.session_date, 1, 19)),
+                NULLIF(SUBSTR(s.session_date, 1, 16), ''),
+                'N/A'
+            ) as session_datetime_str,
+            s.total_drivers,
+            s.competition_id,
+            s.is_time_attack,
+            -- Fastest driver info (migliore giro)
+            fastest.driver_name as fastest_name,
+            fastest.best_lap as fastest_time,
+            -- Competition info se disponibile
+            c.name as competition_name,
+            c.round_number
+        FROM sessions s
+        LEFT JOIN (
+            SELECT
+                sr.session_id,
+                d.last_name as driver_name,
+                sr.best_lap
+            FROM session_results sr
+            JOIN drivers d ON sr.driver_id = d.driver_id
+            WHERE sr.best_lap > 0
+            AND sr.best_lap = (
+                SELECT MIN(sr2.best_lap)
+                FROM session_results sr2
+                WHERE sr2.session_id = sr.session_id
+                AND sr2.best_lap > 0
+            )
+            GROUP BY sr.session_id
+        ) fastest ON s.session_id = fastest.session_id
+        LEFT JOIN competitions c ON s.competition_id = c.competition_id
+        WHERE DATE(s.session_date) >= ? AND DATE(s.session_date) < ?
+        ORDER BY s.session_date DESC
+    '''
+    
+    return pd.read_sql_query(query, _conn, params=[date_from_str, date_to_str])
+
+
+@st.cache_data(ttl=300, show_spinner=False)
+def load_daily_participation(_conn: sqlite3.Connection, db_path: str, db_mtime: float, date_from_str: str, date_to_str: str) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """Partecipanti unici e sessioni per giorno nel periodo [date_from_str, date_to_str): (date, registrati, guest, sessioni)"""
+    # Query per contare partecipanti unici per giorno (separati per registrati e guest) + numero sessioni
+    query = """
+        SELECT
+            DATE(s.session_date) as session_day,
+            COUNT(DISTINCT CASE WHEN d.trust_level > 0 THEN sr.driver_id END) as registered_participants,
+            COUNT(DISTINCT CASE WHEN d.trust_level = 0 THEN sr.driver_id END) as guest_participants,
+            COUNT(DISTINCT s.session_id) as total_sessions
+        FROM sessions s
+        JOIN session_results sr ON s.session_id = sr.session_id
+        JOIN drivers d ON sr.driver_id = d.driver_id
+        WHERE DATE(s.session_date) >= ? AND DATE(s.session_date) < ?
+        GROUP BY DATE(s.session_date)
+        ORDER BY session_day ASC
+    """
+    
+    rows = _conn.execute(query, (date_from_str, date_to_str)).fetchall()
+    
+    # Array NumPy tipizzati (date formattate tutte insieme): Plotly li serializza in blocco
+    dates = np.asarray(format_date_strings([row[0] for row in rows], "%Y-%m-%d"), dtype=object)
+    registered = np.array([reg_count if reg_count else 0 for _, reg_count, _, _ in rows], dtype=np.int64)
+    guests = np.array([guest_count if guest_count else 0 for _, _, guest_count, _ in rows], dtype=np.int64)
+    sessions = np.array([session_count if session_count else 0 for _, _, _, session_count in rows], dtype=np.int64)
+    
+    return dates, registered, guests, sessions
+
+
+@st.cache_data(ttl=300, show_spinner=False)
+def load_track_details(_conn: sqlite3.Connection, db_path: str, db_mtime: float, track_name: str) -> Tuple[Tuple, pd.DataFrame]:
+    """Statistiche della pista e classifica best laps (primi 50) da un unico filtro sui giri: (riga statistiche, classifica)"""
+    # Giri validi di competizioni ufficiali e piloti TFL filtrati una volta sola:
+    # la riga delle statistiche (sempre presente) è ripetuta su ogni riga della classifica
+    query = '''
+        WITH filtered AS (
+            SELECT
+                l.id,
+                l.driver_id,
+                l.lap_time,
+                s.session_id,
+                s.session_date,
+                s.session_type,
+                s.is_time_attack,
+                s.competition_id,
+                d.last_name,
+                d.short_name
+            FROM sessions s
+            JOIN laps l ON s.session_id = l.session_id
+            JOIN drivers d ON l.driver_id = d.driver_id
+            WHERE s.track_name = ?
+              AND l.is_valid_for_best = 1
+              AND l.lap_time > 0
+              AND s.competition_id IS NOT NULL
+              AND d.trust_level > 0
+        ),
+        agg AS (
+            SELECT
+                COUNT(DISTINCT session_id) as total_sessions,
+                COUNT(DISTINCT driver_id) as unique_drivers,
+                COUNT(id) as total_laps,
+                MIN(lap_time) as best_time,
+                AVG(CAST(lap_time AS REAL)) as avg_time,
+                MAX(session_date) as last_session_date,
+                COUNT(DISTINCT CASE WHEN competition_id IS NOT NULL THEN session_id END) as official_sessions
+            FROM filtered
+        ),
+        record AS (
+            SELECT last_name, session_date
+            FROM filtered
+            ORDER BY lap_time ASC, session_date ASC
+            LIMIT 1
+        ),
+        ranked AS (
+            SELECT
+                f.last_name as driver_name,
+                f.short_name,
+                f.lap_time as best_lap,
+                f.session_date,
+                f.session_type,
+                f.is_time_attack,
+                f.competition_id,
+                c.name as competition_name,
+                ch.name as championship_name,
+                -- Miglior giro di ogni pilota: a parità di tempo vale il giro più vecchio
+                ROW_NUMBER() OVER (
+                    PARTITION BY f.driver_id
+                    ORDER BY f.lap_time ASC, f.session_date ASC
+                ) as rn
+            FROM filtered f
+            LEFT JOIN competitions c ON f.competition_id = c.competition_id
+            LEFT JOIN championships ch ON c.championship_id = ch.championship_id
+        ),
+        leaderboard AS (
+            SELECT
+                *,
+                ROW_NUMBER() OVER (ORDER BY best_lap ASC, session_date ASC) as leaderboard_pos
+            FROM ranked
+            WHERE rn = 1
+        )
+        SELECT
+            agg.*,
+            record.last_name,
+            record.session_date,
+            lb.driver_name,
+            lb.short_name,
+            lb.best_lap,
+            lb.session_date,
+            lb.session_type,
+            lb.is_time_attack,
+            lb.competition_id,
+            lb.competition_name,
+            lb.championship_name
+        FROM agg
+        LEFT JOIN record ON 1 = 1
+        LEFT JOIN leaderboard lb ON lb.leaderboard_pos <= 50
+        ORDER BY lb.leaderboard_pos
+    '''
+    
+    rows = _conn.execute(query, (track_name,)).fetchall()
+    
+    # Prime 9 colonne: statistiche e record; le altre: classifica (NULL se la pista non ha giri)
+    leaderboard_columns = [
+        'driver_name', 'short_name', 'best_lap', 'session_date', 'session_type',
+        'is_time_attack', 'competition_id', 'competition_name', 'championship_name'
+    ]
+    leaderboard = pd.DataFrame.from_records(
+        [row[9:] for row in rows if row[11] is not None], columns=leaderboard_columns, coerce_float=True
+    )
+    return rows[0][:9], leaderboard
+
+
 class ACCWebDashboard:
     """Classe principale per il dashboard web ACC"""
     
@@ -43,6 +1090,10 @@ class ACCWebDashboard:
             self.show_database_error()
             st.stop()
         
+        # Connessione condivisa (cache_resource) riusata da tutte le query
+        self._conn = get_shared_connection(self.db_path, self.get_database_mtime())
+        check_indexes(self._conn, self.db_path, self.get_database_mtime())
+        
         # CSS personalizzato
         self.inject_custom_css()
     
@@ -96,12 +1147,15 @@ class ACCWebDashboard:
         for config_file in config_sources:
             if Path(config_file).exists():
                 try:
-                    with open(config_file, 'r', encoding='utf-8') as f:
-                        file_config = json.load(f)
+                    file_config = load_config_file(config_file, os.path.getmtime(config_file))
                     
-                    # Merge con default, priorità al file
-                    merged_config = default_config.copy()
-                    self._deep_merge(merged_config, file_config)
+                    # Merge con default, priorità al file (solo community/database sono annidati)
+                    merged_config = {
+                        **default_config,
+                        **file_config,
+                        'community': {**default_config['community'], **file_config.get('community', {})},
+                        'database': {**default_config['database'], **file_config.get('database', {})}
+                    }
                     
                     # 🎯 IMPOSTA IL FLAG BASANDOSI SUL FILE CARICATO
                     self.is_github_deployment = (config_file == 'acc_config_d.json')
@@ -115,13 +1169,12 @@ class ACCWebDashboard:
         self.is_github_deployment = True
         return default_config
     
-    def _deep_merge(self, base_dict: dict, update_dict: dict):
-        """Merge ricorsivo di dizionari"""
-        for key, value in update_dict.items():
-            if key in base_dict and isinstance(base_dict[key], dict) and isinstance(value, dict):
-                self._deep_merge(base_dict[key], value)
-            else:
-                base_dict[key] = value
+    def get_database_mtime(self) -> float:
+        """Data di modifica del database, usata come chiave di invalidazione delle cache"""
+        try:
+            return os.path.getmtime(self.db_path)
+        except OSError:
+            return 0.0
     
     def check_database(self) -> bool:
         """Verifica esistenza e validità del database"""
@@ -129,163 +1182,40 @@ class ACCWebDashboard:
             return False
         
         try:
-            # Test connessione e tabelle principali
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
+            # Test tabelle principali sulla connessione condivisa (nessuna apertura per rerun)
+            conn = get_shared_connection(self.db_path, self.get_database_mtime())
             
-            # Verifica tabelle essenziali
+            # Verifica tabelle essenziali in una sola query
             required_tables = ['drivers', 'sessions', 'championships']
-            for table in required_tables:
-                cursor.execute(f"SELECT name FROM sqlite_master WHERE type='table' AND name='{table}'")
-                if not cursor.fetchone():
-                    conn.close()
-                    return False
-            
-            conn.close()
-            return True
+            found = {
+                row[0] for row in conn.execute(
+                    "SELECT name FROM sqlite_master WHERE type='table' AND name IN (?, ?, ?)",
+                    required_tables
+                )
+            }
+            return found == set(required_tables)
             
         except Exception:
             return False
 
     def inject_custom_css(self):
         """Inietta CSS personalizzato con miglioramenti per mobile"""
-        st.markdown("""
-        <style>
-        /* CSS esistente + miglioramenti */
-        .main-header {
-            text-align: center;
-            padding: 2rem 0;
-            background: linear-gradient(90deg, #1f4e79, #2d5a87);
-            color: white;
-            border-radius: 10px;
-            margin-bottom: 2rem;
-        }
-        
-        .metric-card {
-            background: white;
-            padding: 1.5rem;
-            border-radius: 10px;
-            box-shadow: 0 2px 4px rgba(0,0,0,0.1);
-            border-left: 4px solid #1f4e79;
-            margin-bottom: 1rem;
-        }
-        
-        .metric-value {
-            font-size: 2.5rem;
-            font-weight: bold;
-            color: #1f4e79;
-            margin: 0;
-        }
-        
-        .metric-label {
-            font-size: 1.1rem;
-            color: #666;
-            margin: 0;
-        }
-        
-        .championship-header {
-            background: linear-gradient(135deg, #2d2d2d, #1e1e1e);
-            color: white;
-            padding: 1rem;
-            border-radius: 8px;
-            text-align: center;
-            margin: 1rem 0;
-        }
-        
-        .competition-header {
-            background: linear-gradient(135deg, #3d3d3d, #2a2a2a);
-            color: white;
-            padding: 0.8rem;
-            border-radius: 6px;
-            text-align: center;
-            margin: 1rem 0;
-        }
-        
-        .session-header {
-            background: #f0f2f6;
-            padding: 0.5rem 1rem;
-            border-radius: 4px;
-            border-left: 3px solid #1f4e79;
-            margin: 0.5rem 0;
-        }
-        
-        .environment-indicator {
-            position: fixed;
-            top: 10px;
-            right: 10px;
-            background: rgba(0,0,0,0.7);
-            color: white;
-            padding: 0.3rem 0.8rem;
-            border-radius: 15px;
-            font-size: 0.8rem;
-            z-index: 1000;
-        }
-        
-        .github-badge {
-            background: #24292e;
-            color: white;
-        }
-        
-        .local-badge {
-            background: #28a745;
-            color: white;
-        }
-        
-        .fun-header {
-            background: linear-gradient(90deg, #28a745, #20c997);
-            color: white;
-            padding: 1rem;
-            border-radius: 8px;
-            text-align: center;
-            margin: 1rem 0;
-        }
+        # Ripetuto a ogni rerun (Streamlit rimuove gli elementi non riemessi), ma già minificato
+        st.markdown(CUSTOM_CSS, unsafe_allow_html=True)
 
-        .social-buttons button:hover {
-            transform: translateY(-2px);
-            box-shadow: 0 6px 12px rgba(0,0,0,0.3) !important;
-            transition: all 0.3s ease;
-        }
-        
-        /* Responsive improvements */
-        @media (max-width: 768px) {
-            .metric-value {
-                font-size: 2rem;
-            }
-            
-            .main-header h1 {
-                font-size: 1.8rem;
-            }
-            
-            .main-header h3 {
-                font-size: 1.2rem;
-            }
-        }
-        
-        /* Fix per tabelle su mobile */
-        .dataframe {
-            font-size: 0.9rem;
-        }
-        
-        @media (max-width: 768px) {
-            .dataframe {
-                font-size: 0.8rem;
-            }
-        }
-        </style>
-        """, unsafe_allow_html=True)
-
-    def safe_sql_query(self, query: str, params: List = None) -> pd.DataFrame:
-        """Esegue query SQL con gestione errori"""
+    def safe_sql_query(self, query: str, params: List = None, dtype_backend: Optional[str] = None) -> pd.DataFrame:
+        """Esegue query SQL con gestione errori (dtype_backend="pyarrow" per colonne Arrow)"""
         try:
-            conn = sqlite3.connect(self.db_path)
-            df = pd.read_sql_query(query, conn, params=params or [])
-            conn.close()
+            read_kwargs = {'dtype_backend': dtype_backend} if dtype_backend else {}
+            df = pd.read_sql_query(query, self._conn, params=params or [], **read_kwargs)
             return df
         except Exception as e:
             st.error(f"❌ Errore nella query: {e}")
             return pd.DataFrame()
 
-    def format_lap_time(self, lap_time_ms: Optional[int]) -> str:
+    @staticmethod
+    @lru_cache(maxsize=4096)
+    def format_lap_time(lap_time_ms: Optional[int]) -> str:
         """Converte tempo giro da millisecondi a formato MM:SS.sss"""
         if not lap_time_ms or lap_time_ms <= 0:
             return "N/A"
@@ -297,84 +1227,66 @@ class ACCWebDashboard:
         minutes = lap_time_ms // 60000
         seconds = (lap_time_ms % 60000) / 1000
         return f"{minutes}:{seconds:06.3f}"
+
+    def format_lap_time_series(self, lap_times: pd.Series) -> pd.Series:
+        """Versione vettoriale di format_lap_time per intere colonne (stessi filtri anti-anomalie)"""
+        ms = pd.to_numeric(lap_times, errors='coerce').to_numpy(dtype=float)
+        valid = (ms >= 30000) & (ms <= 3600000)  # NaN escluso automaticamente
+
+        ms_int = np.where(valid, ms, 0).astype(np.int64)
+        minutes = (ms_int // 60000).astype(str)
+        seconds = np.char.mod('%06.3f', (ms_int % 60000) / 1000)
+        formatted = np.char.add(np.char.add(minutes, ':'), seconds)
+
+        return pd.Series(np.where(valid, formatted, "N/A"), index=lap_times.index, dtype=object)
+
+    def format_position_series(self, positions: pd.Series, medals: bool = True, na_value: str = "NC") -> pd.Series:
+        """Posizioni come testo intero (medaglie per il podio se richieste), NaN -> na_value"""
+        num = pd.to_numeric(positions, errors='coerce')
+        valid = num.notna().to_numpy()
+
+        pos = num.fillna(0).to_numpy(dtype=float)
+        text = np.where(valid, np.char.mod('%d', pos), na_value).astype(object)
+        if medals:
+            # Gather per indice (0 = nessuna medaglia) invece del lookup su dict
+            podium = np.isin(pos, (1, 2, 3))
+            text = np.where(podium, POSITION_MEDAL_LOOKUP.take(np.where(podium, pos, 0).astype(np.intp)), text)
+        return pd.Series(text, index=positions.index, dtype=object)
+
+    def format_positive_series(self, values: pd.Series, fmt: str = '%.1f', empty: str = "-") -> pd.Series:
+        """Formatta con fmt (stile printf) i soli valori > 0; zero, negativi e NaN diventano empty"""
+        num = pd.to_numeric(values, errors='coerce').to_numpy(dtype=float)
+        positive = num > 0  # NaN escluso automaticamente
+
+        formatted = np.char.mod(fmt, np.where(positive, num, 0))
+        return pd.Series(np.where(positive, formatted, empty), index=values.index, dtype=object)
+
+    def format_signed_series(self, values: pd.Series, empty: str = "-") -> pd.Series:
+        """Formatta con segno esplicito (+1.0 / -1.0); zero e NaN diventano empty"""
+        num = pd.to_numeric(values, errors='coerce').to_numpy(dtype=float)
+        magnitude = np.char.mod('%.1f', np.abs(np.nan_to_num(num)))
+
+        signed = np.where(num > 0, np.char.add('+', magnitude), np.char.add('-', magnitude))
+        return pd.Series(np.where((num > 0) | (num < 0), signed, empty), index=values.index, dtype=object)
+
+    def format_member_points_series(self, points: pd.Series, trust_levels: pd.Series) -> pd.Series:
+        """Punti con un decimale: a zero "0.0" per i membri TFL e "-" per i guest (e per i NaN)"""
+        num = pd.to_numeric(points, errors='coerce').to_numpy(dtype=float)
+        is_member = pd.to_numeric(trust_levels, errors='coerce').to_numpy(dtype=float) > 0
+
+        formatted = np.char.mod('%.1f', np.where(num == 0, 0.0, np.nan_to_num(num)))  # -0.0 -> "0.0"
+        hidden = np.isnan(num) | ((num == 0) & ~is_member)
+        return pd.Series(np.where(hidden, "-", formatted), index=points.index, dtype=object)
+
+    def to_arrow_strings(self, df: pd.DataFrame) -> pd.DataFrame:
+        """Colonne di testo (object) in string[pyarrow]: buffer contiguo, già nel formato di trasporto di st.dataframe"""
+        text_cols = df.columns[(df.dtypes == object).to_numpy()]
+        return df.astype({col: 'string[pyarrow]' for col in text_cols})
     
     def get_database_stats(self) -> Dict:
         """Ottiene statistiche generali dal database con gestione errori migliorata"""
         try:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-            
-            # Statistiche base con fallback
-            stats = {}
-            
-            # Query sicure con gestione errori
-            safe_queries = {
-                'total_drivers': 'SELECT COUNT(*) FROM drivers WHERE trust_level > 0',
-                'guest_drivers': 'SELECT COUNT(*) FROM drivers WHERE trust_level = 0',
-                'total_leagues': 'SELECT COUNT(*) FROM leagues',
-                'total_sessions': 'SELECT COUNT(*) FROM sessions',
-                'total_valid_laps': '''SELECT COUNT(*) FROM laps
-                                     WHERE is_valid_for_best = 1''',
-            }
-            
-            for key, query in safe_queries.items():
-                try:
-                    cursor.execute(query)
-                    result = cursor.fetchone()
-                    stats[key] = result[0] if result else 0
-                except Exception as e:
-                    st.warning(f"⚠️ Error in query {key}: {e}")
-                    stats[key] = 0
-            
-            # Ultima gara di campionato
-            try:
-                cursor.execute('''SELECT MAX(date_start) FROM competitions 
-                                WHERE championship_id IS NOT NULL AND is_completed = 1''')
-                stats['last_championship_race'] = cursor.fetchone()[0]
-            except Exception:
-                stats['last_championship_race'] = None
-            
-            # Detentore del titolo - pilota vincitore dell'ultimo campionato completato
-            try:
-                cursor.execute('''
-                    SELECT d.last_name 
-                    FROM championship_standings cs
-                    JOIN drivers d ON cs.driver_id = d.driver_id
-                    JOIN championships ch ON cs.championship_id = ch.championship_id
-                    WHERE cs.position = 1 AND ch.is_completed = 1
-                    ORDER BY ch.end_date DESC
-                    LIMIT 1
-                ''')
-                result = cursor.fetchone()
-                stats['title_holder'] = result[0] if result else None
-            except Exception:
-                stats['title_holder'] = None
-            
-            # Prossima competizione prevista
-            try:
-                cursor.execute('''
-                    SELECT c.name, c.date_start, c.track_name, ch.name as championship_name
-                    FROM competitions c
-                    LEFT JOIN championships ch ON c.championship_id = ch.championship_id
-                    WHERE c.is_completed = 0 AND c.date_start IS NOT NULL
-                    ORDER BY c.date_start ASC
-                    LIMIT 1
-                ''')
-                result = cursor.fetchone()
-                if result:
-                    stats['next_competition'] = {
-                        'name': result[0],
-                        'date': result[1],
-                        'track': result[2],
-                        'championship': result[3]
-                    }
-                else:
-                    stats['next_competition'] = None
-            except Exception:
-                stats['next_competition'] = None
-            
-            conn.close()
-            return stats
+            return load_database_stats(self._conn, self.db_path, self.get_database_mtime())
             
         except Exception as e:
             st.error(f"❌ Errore nel recupero statistiche: {e}")
@@ -392,49 +1304,52 @@ class ACCWebDashboard:
     
     def get_session_results(self, session_id: str) -> pd.DataFrame:
         """Ottiene risultati sessione"""
-        query = """
-            SELECT
-                sr.position,
-                sr.race_number,
-                d.last_name as driver,
-                COALESCE(cm.car_name, sr.car_model) as car,
-                sr.lap_count,
-                sr.best_lap,
-                sr.total_time,
-                sr.is_spectator,
-                d.trust_level
-            FROM session_results sr
-            JOIN drivers d ON sr.driver_id = d.driver_id
-            LEFT JOIN car_models cm ON sr.car_model = cm.car_model
-            WHERE sr.session_id = ?
-            ORDER BY
-                CASE WHEN sr.position IS NULL THEN 1 ELSE 0 END,
-                sr.position
-        """
+        try:
+            return load_session_results(self._conn, self.db_path, self.get_database_mtime(), session_id)
+        except Exception as e:
+            st.error(f"❌ Errore nella query: {e}")
+            return pd.DataFrame()
+
+    def get_sessions_results(self, session_ids: List[str]) -> Dict[str, pd.DataFrame]:
+        """Ottiene risultati di più sessioni con una sola query, divisi per sessione"""
+        if not session_ids:
+            return {}
+        try:
+            results_df = load_sessions_results(self._conn, self.db_path, self.get_database_mtime(), tuple(session_ids))
+        except Exception as e:
+            st.error(f"❌ Errore nella query: {e}")
+            return {}
 
-        return self.safe_sql_query(query, [session_id])
+        return {
+            session_id: group.drop(columns='session_id').reset_index(drop=True)
+            for session_id, group in results_df.groupby('session_id', sort=False)
+        }
 
-    def format_session_date(self, session_date: str) -> str:
+    @staticmethod
+    @lru_cache(maxsize=4096)
+    def format_session_date(session_date: str) -> str:
         """Formatta data sessione per visualizzazione"""
+        # Percorso veloce: ISO già nel formato atteso, basta riordinare i campi
+        if isinstance(session_date, str) and ISO_DATE_RE.match(session_date):
+            return f"{session_date[8:10]}/{session_date[5:7]}/{session_date[0:4]}"
+        
         try:
             date_obj = datetime.fromisoformat(session_date.replace('Z', '+00:00'))
             return date_obj.strftime('%d/%m/%Y')
         except:
             return session_date[:10] if session_date else 'N/A'
 
-    def format_session_type(self, session_type: str) -> str:
-        """Formatta tipo sessione per visualizzazione compatta"""
-        session_mapping = {
-            'R1': 'Gara', 'R2': 'Gara', 'R3': 'Gara', 'R4': 'Gara', 'R5': 'Gara',
-            'R6': 'Gara', 'R7': 'Gara', 'R8': 'Gara', 'R9': 'Gara', 'R': 'Gara',
-            'Q1': 'Qualifiche', 'Q2': 'Qualifiche', 'Q3': 'Qualifiche', 'Q4': 'Qualifiche',
-            'Q5': 'Qualifiche', 'Q6': 'Qualifiche', 'Q7': 'Qualifiche', 'Q8': 'Qualifiche',
-            'Q9': 'Qualifiche', 'Q': 'Qualifiche',
-            'FP1': 'Prove', 'FP2': 'Prove', 'FP3': 'Prove', 'FP4': 'Prove', 'FP5': 'Prove',
-            'FP6': 'Prove', 'FP7': 'Prove', 'FP8': 'Prove', 'FP9': 'Prove', 'FP': 'Prove'
-        }
-        
-        return session_mapping.get(session_type, session_type)
+    def format_unique_values(self, values: pd.Series, formatter, na_value: str = "N/A") -> pd.Series:
+        """Applica un formatter una sola volta per valore distinto della colonna (NaN -> na_value)
+
+        Per formatter senza cache propria: quelli con lru_cache vanno mappati direttamente.
+        """
+        mapping = {value: formatter(value) for value in values.dropna().unique()}
+        return values.map(mapping).fillna(na_value)
+
+    def format_session_type_series(self, session_types: pd.Series) -> pd.Series:
+        """Formatta una colonna di tipi sessione (tipi sconosciuti lasciati invariati)"""
+        return session_types.map(SESSION_TYPE_MAP).fillna(session_types)
     
 
     # ==================== HOMEPAGE ====================
@@ -454,17 +1369,15 @@ class ACCWebDashboard:
             # Verifica se il banner esiste
             banner_path = "banner.jpg"
             if Path(banner_path).exists():
-                # Converti l'immagine in base64 per embedding CSS
-                import base64
-                with open(banner_path, "rb") as img_file:
-                    img_base64 = base64.b64encode(img_file.read()).decode()
+                # Immagine in base64 per embedding CSS (codificata una volta sola)
+                img_base64 = load_banner_base64(banner_path, os.path.getmtime(banner_path))
 
                 community_name = self.config['community']['name']
                 community_description = self.config['community'].get('description', 'ACC Server Dashboard')
 
                 # Banner con background image e testo sovrapposto via CSS puro
                 st.markdown(f"""
-                <div style="
+                <div class="community-banner" style="
                     background-image: url(data:image/jpeg;base64,{img_base64});
                     background-size: cover;
                     background-position: center;
@@ -489,38 +1402,10 @@ class ACCWebDashboard:
                         <h3 style="margin: 0.5rem 0 0 0; font-size: 1.5rem; text-shadow: 2px 2px 4px rgba(0,0,0,0.8);">{community_description}</h3>
                     </div>
                 </div>
-
-                <style>
-                @media (max-width: 768px) {{
-                    div[data-testid="stMarkdownContainer"] h1 {{
-                        font-size: 2rem !important;
-                    }}
-                    div[data-testid="stMarkdownContainer"] h3 {{
-                        font-size: 1.2rem !important;
-                    }}
-                }}
-                </style>
                 """, unsafe_allow_html=True)
 
                 # Link social (solo se configurati)
-                social_config = self.config.get('social', {})
-                discord_url = social_config.get('discord')
-                simgrid_url = social_config.get('simgrid')
-
-                if discord_url or simgrid_url:
-                    social_buttons = []
-
-                    if simgrid_url:
-                        social_buttons.append(f'<a href="{simgrid_url}" target="_blank" style="text-decoration: none; margin: 0 1rem;"><button style="background: linear-gradient(90deg, #5865f2, #7289da); color: white; border: none; padding: 0.8rem 1.5rem; border-radius: 25px; font-weight: bold; cursor: pointer; box-shadow: 0 4px 8px rgba(0,0,0,0.2);">🏆 SimGrid Community</button></a>')
-
-                    if discord_url:
-                        social_buttons.append(f'<a href="{discord_url}" target="_blank" style="text-decoration: none; margin: 0 1rem;"><button style="background: linear-gradient(90deg, #5865f2, #7289da); color: white; border: none; padding: 0.8rem 1.5rem; border-radius: 25px; font-weight: bold; cursor: pointer; box-shadow: 0 4px 8px rgba(0,0,0,0.2);">💬 Join Discord</button></a>')
-
-                    st.markdown(f"""
-                    <div style="text-align: center; margin: 1rem 0;">
-                        {''.join(social_buttons)}
-                    </div>
-                    """, unsafe_allow_html=True)
+                self.show_social_buttons()
 
             else:
                 # Fallback con il riquadro blu originale se non c'è il banner
@@ -534,28 +1419,18 @@ class ACCWebDashboard:
                 """, unsafe_allow_html=True)
 
                 # Link social (solo se configurati)
-                social_config = self.config.get('social', {})
-                discord_url = social_config.get('discord')
-                simgrid_url = social_config.get('simgrid')
-
-                if discord_url or simgrid_url:
-                    social_buttons = []
-
-                    if simgrid_url:
-                        social_buttons.append(f'<a href="{simgrid_url}" target="_blank" style="text-decoration: none; margin: 0 1rem;"><button style="background: linear-gradient(90deg, #5865f2, #7289da); color: white; border: none; padding: 0.8rem 1.5rem; border-radius: 25px; font-weight: bold; cursor: pointer; box-shadow: 0 4px 8px rgba(0,0,0,0.2);">🏆 SimGrid Community</button></a>')
-
-                    if discord_url:
-                        social_buttons.append(f'<a href="{discord_url}" target="_blank" style="text-decoration: none; margin: 0 1rem;"><button style="background: linear-gradient(90deg, #5865f2, #7289da); color: white; border: none; padding: 0.8rem 1.5rem; border-radius: 25px; font-weight: bold; cursor: pointer; box-shadow: 0 4px 8px rgba(0,0,0,0.2);">💬 Join Discord</button></a>')
-
-                    st.markdown(f"""
-                    <div style="text-align: center; margin: 1rem 0;">
-                        {''.join(social_buttons)}
-                    </div>
-                    """, unsafe_allow_html=True)
+                self.show_social_buttons()
         except Exception as e:
             # Fallback in caso di errore
             pass
 
+    def show_social_buttons(self):
+        """Mostra i pulsanti social configurati (HTML generato una volta sola)"""
+        social_config = self.config.get('social', {})
+        social_html = build_social_buttons_html(social_config.get('discord'), social_config.get('simgrid'))
+        if social_html:
+            st.markdown(social_html, unsafe_allow_html=True)
+
     def show_database_error(self):
         """Mostra errore database con istruzioni specifiche per l'ambiente"""
         st.error("❌ **Database non disponibile**")
@@ -703,7 +1578,7 @@ class ACCWebDashboard:
         st.header("Time Attack")
 
         try:
-            conn = sqlite3.connect(self.db_path)
+            conn = self._conn
             cursor = conn.cursor()
 
             # Ottieni TUTTE le competizioni (come in Standings)
@@ -722,7 +1597,12 @@ class ACCWebDashboard:
                     (SELECT COUNT(*) FROM time_attack_results WHERE competition_id = c.competition_id) as results_count,
                     l.name as league_name,
                     ch.tier_number,
-                    ch.name as tier_name
+                    ch.name as tier_name,
+                    -- Etichetta selectbox costruita direttamente da SQLite
+                    CASE WHEN c.round_number THEN 'R' || c.round_number || ' - ' ELSE '' END
+                        || c.name || ' - ' || c.track_name
+                        || CASE WHEN c.date_start <> '' THEN ' (' || SUBSTR(c.date_start, 1, 10) || ')' ELSE '' END
+                        || CASE WHEN c.is_completed THEN ' ✅' ELSE ' 🔄' END as display_name
                 FROM competitions c
                 LEFT JOIN championships ch ON c.championship_id = ch.championship_id
                 LEFT JOIN leagues l ON ch.league_id = l.league_id
@@ -737,28 +1617,16 @@ class ACCWebDashboard:
 
             if not competitions:
                 st.warning("❌ No competitions found in database")
-                conn.close()
                 return
 
-            # Prepara opzioni per selectbox
-            competition_options = []
-            competition_map = {}
+            # Prepara opzioni per selectbox (etichetta già pronta nell'ultima colonna)
+            competition_options = [row[-1] for row in competitions]
+            competition_map = {row[-1]: row[:-1] for row in competitions}
             default_index = 0
 
-            for idx, (comp_id, name, track, round_num, date_start, date_end, weekend_format, is_completed, session_count, results_count, league_name, tier_number, tier_name) in enumerate(competitions):
-                # Formato display
-                round_str = f"R{round_num} - " if round_num else ""
-                status_str = " ✅" if is_completed else " 🔄"
-                date_str = f" ({date_start[:10]})" if date_start else ""
-
-                display_name = f"{round_str}{name} - {track}{date_str}{status_str}"
-
-                competition_options.append(display_name)
-                competition_map[display_name] = (comp_id, name, track, round_num, date_start, date_end, weekend_format, is_completed, session_count, results_count, league_name, tier_number, tier_name)
-
             # Trova default index: più recente con risultati Time Attack o sessioni Time Attack
             first_with_data_idx = None
-            for idx, (comp_id, name, track, round_num, date_start, date_end, weekend_format, is_completed, session_count, results_count, league_name, tier_number, tier_name) in enumerate(competitions):
+            for idx, (comp_id, name, track, round_num, date_start, date_end, weekend_format, is_completed, session_count, results_count, league_name, tier_number, tier_name, display_name) in enumerate(competitions):
                 if (session_count > 0 or results_count > 0) and first_with_data_idx is None:
                     first_with_data_idx = idx
                     break
@@ -831,7 +1699,6 @@ class ACCWebDashboard:
                 """, (comp_id,))
 
                 ta_results = cursor.fetchall()
-                conn.close()
 
                 if not ta_results:
                     st.info("ℹ️ No Time Attack results recorded for this competition")
@@ -851,54 +1718,42 @@ class ACCWebDashboard:
                     except:
                         is_expired = False
 
-                # Crea DataFrame
-                data = []
-                prev_time = None
-                for idx, (driver, lap_time, split1, split2, split3, points, session_date, car_name) in enumerate(ta_results, 1):
-                    # Calcola gap rispetto al pilota che precede
-                    if idx > 1 and prev_time is not None:
-                        gap_ms = lap_time - prev_time
-                        gap_seconds = gap_ms / 1000.0
-                        gap_str = f"+{gap_seconds:.3f}s"
-                    else:
-                        gap_str = "-"
-                    prev_time = lap_time
-
-                    # Formatta splits (da milliseconds a secondi)
-                    def format_split(split_ms):
-                        if split_ms is None or split_ms == 0:
-                            return "-"
-                        return f"{split_ms / 1000:.3f}s"
-
-                    split1_str = format_split(split1)
-                    split2_str = format_split(split2)
-                    split3_str = format_split(split3)
-
-                    # Formatta data con ora
-                    if session_date:
-                        try:
-                            from datetime import datetime
-                            date_obj = datetime.fromisoformat(session_date.replace('Z', '+00:00'))
-                            date_str = date_obj.strftime('%d/%m/%Y %H:%M')
-                        except:
-                            date_str = session_date[:16] if len(session_date) >= 16 else session_date[:10] if session_date else 'N/A'
-                    else:
-                        date_str = 'N/A'
-
-                    data.append({
-                        "Pos": str(idx),
-                        "Driver": driver,
-                        "Car": car_name if car_name else "-",
-                        "Points": f"{points:.1f}" if points and points > 0 else "0.0",
-                        "Best Lap": self.format_lap_time(lap_time),
-                        "Gap": gap_str,
-                        "S1": split1_str,
-                        "S2": split2_str,
-                        "S3": split3_str,
-                        "Date": date_str
-                    })
-
-                df = pd.DataFrame(data)
+                # Crea DataFrame formattando intere colonne (niente loop per riga)
+                ta_df = pd.DataFrame(ta_results, columns=[
+                    'driver', 'lap_time', 'split1', 'split2', 'split3', 'points', 'session_date', 'car_name'
+                ])
+
+                # Gap rispetto al pilota che precede (il primo non ha gap)
+                gap_seconds = ta_df['lap_time'].diff().to_numpy(dtype=float) / 1000.0
+                gap_str = np.where(np.isnan(gap_seconds), "-", np.char.mod('+%.3fs', np.nan_to_num(gap_seconds)))
+
+                # Formatta splits (da milliseconds a secondi, vuoti o zero -> "-")
+                def format_splits(splits_ms):
+                    ms = pd.to_numeric(splits_ms, errors='coerce').fillna(0).to_numpy(dtype=float)
+                    return np.where(ms == 0, "-", np.char.mod('%.3fs', ms / 1000))
+
+                # Formatta data con ora (una volta per valore distinto)
+                def format_ta_date(session_date):
+                    try:
+                        date_obj = datetime.fromisoformat(session_date.replace('Z', '+00:00'))
+                        return date_obj.strftime('%d/%m/%Y %H:%M')
+                    except:
+                        return session_date[:16] if len(session_date) >= 16 else session_date[:10] if session_date else 'N/A'
+
+                points = pd.to_numeric(ta_df['points'], errors='coerce').fillna(0).to_numpy(dtype=float)
+
+                df = pd.DataFrame({
+                    "Pos": np.arange(1, len(ta_df) + 1).astype(str),
+                    "Driver": ta_df['driver'],
+                    "Car": ta_df['car_name'].where(ta_df['car_name'].astype(bool) & ta_df['car_name'].notna(), "-"),
+                    "Points": np.where(points > 0, np.char.mod('%.1f', points), "0.0"),
+                    "Best Lap": self.format_lap_time_series(ta_df['lap_time']),
+                    "Gap": gap_str,
+                    "S1": format_splits(ta_df['split1']),
+                    "S2": format_splits(ta_df['split2']),
+                    "S3": format_splits(ta_df['split3']),
+                    "Date": self.format_unique_values(ta_df['session_date'], format_ta_date)
+                })
 
                 # Calcola altezza per mostrare almeno 15 piloti senza scroll
                 # ~35px per riga + ~38px per header
@@ -910,8 +1765,8 @@ class ACCWebDashboard:
                 table_height = (display_rows * row_height) + header_height
 
                 # Applica colore alla colonna Points: verde se scaduta (punti definitivi), rosso altrimenti (punti provvisori)
-                points_style = 'color: #44BB44; font-weight: bold' if is_expired else 'color: #FF4444; font-weight: bold'
-                styled_df = df.style.applymap(lambda x: points_style, subset=['Points'])
+                points_color = '#44BB44' if is_expired else '#FF4444'
+                styled_df = df.style.set_properties(subset=['Points'], **{'color': points_color, 'font-weight': 'bold'})
 
                 st.dataframe(
                     styled_df,
@@ -982,59 +1837,16 @@ class ACCWebDashboard:
 
     def get_competition_results(self, competition_id: int) -> pd.DataFrame:
         """Ottiene risultati competizione con dettagli completi"""
-        query = """
-            SELECT
-                d.last_name as driver,
-                cs.race_points,
-                cs.pole_points,
-                cs.fastest_lap_points,
-                cs.time_attack_points,
-                cs.points_bonus,
-                cs.points_dropped,
-                cs.total_points,
-                cs.guests_beaten,
-                cs.beaten_by_guests,
-                d.trust_level
-            FROM competition_standings cs
-            JOIN drivers d ON cs.driver_id = d.driver_id
-            WHERE cs.competition_id = ?
-                AND d.trust_level > 0
-            ORDER BY cs.total_points DESC,
-                     cs.race_points DESC
-        """
-
-        return self.safe_sql_query(query, [competition_id])
+        try:
+            return load_competition_results(self._conn, self.db_path, self.get_database_mtime(), competition_id)
+        except Exception as e:
+            st.error(f"❌ Errore nella query: {e}")
+            return pd.DataFrame()
     
     def get_competition_sessions(self, competition_id: int) -> List[Tuple]:
         """Ottiene sessioni della competizione con nome del pilota che ha fatto il best lap"""
         try:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-
-            cursor.execute("""
-                SELECT
-                    s.session_id,
-                    s.session_type,
-                    s.session_date,
-                    s.session_order,
-                    s.total_drivers,
-                    s.best_lap_overall,
-                    d.last_name as best_lap_driver
-                FROM sessions s
-                LEFT JOIN session_results sr ON s.session_id = sr.session_id
-                    AND s.best_lap_overall = sr.best_lap
-                    AND sr.is_spectator = FALSE
-                LEFT JOIN drivers d ON sr.driver_id = d.driver_id
-                WHERE s.competition_id = ?
-                    AND (s.is_time_attack IS NULL OR s.is_time_attack = 0)
-                ORDER BY s.session_order, s.session_date
-            """, (competition_id,))
-
-            sessions = cursor.fetchall()
-            conn.close()
-
-            return sessions
-
+            return load_competition_sessions(self._conn, self.db_path, self.get_database_mtime(), competition_id)
         except Exception as e:
             st.error(f"❌ Errore nel recupero sessioni: {e}")
             return []
@@ -1044,7 +1856,7 @@ class ACCWebDashboard:
         st.header("Race Results")
 
         try:
-            conn = sqlite3.connect(self.db_path)
+            conn = self._conn
             cursor = conn.cursor()
 
             # Ottieni TUTTE le competizioni (come in Time Attack)
@@ -1063,7 +1875,12 @@ class ACCWebDashboard:
                     (SELECT COUNT(*) FROM competition_standings WHERE competition_id = c.competition_id) as results_count,
                     l.name as league_name,
                     ch.tier_number,
-                    ch.name as tier_name
+                    ch.name as tier_name,
+                    -- Etichetta selectbox costruita direttamente da SQLite
+                    CASE WHEN c.round_number THEN 'R' || c.round_number || ' - ' ELSE '' END
+                        || c.name || ' - ' || c.track_name
+                        || CASE WHEN c.date_start <> '' THEN ' (' || SUBSTR(c.date_start, 1, 10) || ')' ELSE '' END
+                        || CASE WHEN c.is_completed THEN ' ✅' ELSE ' 🔄' END as display_name
                 FROM competitions c
                 LEFT JOIN championships ch ON c.championship_id = ch.championship_id
                 LEFT JOIN leagues l ON ch.league_id = l.league_id
@@ -1078,28 +1895,16 @@ class ACCWebDashboard:
 
             if not competitions:
                 st.warning("❌ No competitions found in database")
-                conn.close()
                 return
 
-            # Prepara opzioni per selectbox
-            competition_options = []
-            competition_map = {}
+            # Prepara opzioni per selectbox (etichetta già pronta nell'ultima colonna)
+            competition_options = [row[-1] for row in competitions]
+            competition_map = {row[-1]: row[:-1] for row in competitions}
             default_index = 0
 
-            for idx, (comp_id, name, track, round_num, date_start, date_end, weekend_format, is_completed, session_count, results_count, league_name, tier_number, tier_name) in enumerate(competitions):
-                # Formato display
-                round_str = f"R{round_num} - " if round_num else ""
-                status_str = " ✅" if is_completed else " 🔄"
-                date_str = f" ({date_start[:10]})" if date_start else ""
-
-                display_name = f"{round_str}{name} - {track}{date_str}{status_str}"
-
-                competition_options.append(display_name)
-                competition_map[display_name] = (comp_id, name, track, round_num, date_start, date_end, weekend_format, is_completed, session_count, results_count, league_name, tier_number, tier_name)
-
             # Trova default index: più recente con risultati o sessioni
             first_with_data_idx = None
-            for idx, (comp_id, name, track, round_num, date_start, date_end, weekend_format, is_completed, session_count, results_count, league_name, tier_number, tier_name) in enumerate(competitions):
+            for idx, (comp_id, name, track, round_num, date_start, date_end, weekend_format, is_completed, session_count, results_count, league_name, tier_number, tier_name, display_name) in enumerate(competitions):
                 if (session_count > 0 or results_count > 0) and first_with_data_idx is None:
                     first_with_data_idx = idx
                     break
@@ -1144,77 +1949,31 @@ class ACCWebDashboard:
                 results_df = self.get_competition_results(comp_id)
 
                 if not results_df.empty:
-                    # Formatta risultati per visualizzazione
-                    results_display = results_df.copy()
-
-                    # Aggiungi posizione basata sull'ordine (già ordinato per punti nella query)
-                    results_display['Pos'] = range(1, len(results_display) + 1)
-                    results_display['Pos'] = results_display['Pos'].apply(lambda x: str(x))
-
-                    # Formatta i valori numerici
-                    # Race points: "0.0" per membri con 0 punti, "-" per guest con 0 punti, altrimenti valore
-                    results_display['race_points'] = results_display.apply(
-                        lambda row: "0.0" if pd.notna(row['race_points']) and row['race_points'] == 0 and row['trust_level'] > 0
-                        else ("-" if pd.notna(row['race_points']) and row['race_points'] == 0
-                        else (f"{row['race_points']:.1f}" if pd.notna(row['race_points']) else "-")),
-                        axis=1
-                    )
-                    results_display['pole_points'] = results_display['pole_points'].apply(lambda x: f"{int(x)}" if pd.notna(x) and x > 0 else "-")
-                    results_display['fastest_lap_points'] = results_display['fastest_lap_points'].apply(lambda x: f"{int(x)}" if pd.notna(x) and x > 0 else "-")
-                    results_display['time_attack_points'] = results_display['time_attack_points'].apply(lambda x: f"{x:.1f}" if pd.notna(x) and x > 0 else "-")
+                    # Tabella costruita direttamente dalle colonne formattate, nell'ordine di visualizzazione
+                    # Race/Total points: "0.0" per membri con 0 punti, "-" per guest con 0 punti, altrimenti valore
                     # Bonus: mostra + se positivo, - se negativo, "-" se zero/null
-                    results_display['points_bonus'] = results_display['points_bonus'].apply(
-                        lambda x: f"+{x:.1f}" if pd.notna(x) and x > 0 else (f"-{abs(x):.1f}" if pd.notna(x) and x < 0 else "-")
-                    )
-                    results_display['points_dropped'] = results_display['points_dropped'].apply(lambda x: f"{x:.1f}" if pd.notna(x) and x > 0 else "-")
-                    # Total points: "0.0" per membri con 0 punti, "-" per guest con 0 punti, altrimenti valore
-                    results_display['total_points'] = results_display.apply(
-                        lambda row: "0.0" if pd.notna(row['total_points']) and row['total_points'] == 0 and row['trust_level'] > 0
-                        else ("-" if pd.notna(row['total_points']) and row['total_points'] == 0
-                        else (f"{row['total_points']:.1f}" if pd.notna(row['total_points']) else "-")),
-                        axis=1
-                    )
-                    results_display['guests_beaten'] = results_display['guests_beaten'].apply(lambda x: f"{int(x)}" if pd.notna(x) and x > 0 else "-")
-                    results_display['beaten_by_guests'] = results_display['beaten_by_guests'].apply(lambda x: f"{int(x)}" if pd.notna(x) and x > 0 else "-")
-
-                    # Seleziona colonne da mostrare nell'ordine richiesto
-                    columns_to_show = [
-                        'Pos', 'driver', 'total_points', 'time_attack_points', 'race_points', 'pole_points',
-                        'fastest_lap_points', 'points_dropped', 'points_bonus',
-                        'guests_beaten', 'beaten_by_guests'
-                    ]
-
-                    # Rinomina colonne con i nomi corti
-                    column_names = {
-                        'Pos': 'Pos',
-                        'driver': 'Driver',
-                        'total_points': 'Total Pts',
-                        'race_points': 'Race Pts',
-                        'pole_points': 'Pole Pts',
-                        'fastest_lap_points': 'FLap Pts',
-                        'time_attack_points': 'TA Pts',
-                        'points_dropped': 'Drop Pts',
-                        'points_bonus': 'Bonus G Pts',
-                        'guests_beaten': 'G+',
-                        'beaten_by_guests': 'G-'
-                    }
-
-                    results_display = results_display[columns_to_show]
-                    results_display.columns = [column_names[col] for col in columns_to_show]
+                    trust_levels = results_df['trust_level']
+                    results_display = self.to_arrow_strings(pd.DataFrame({
+                        # Posizione basata sull'ordine (già ordinato per punti nella query)
+                        'Pos': np.arange(1, len(results_df) + 1).astype(str),
+                        'Driver': results_df['driver'],
+                        'Total Pts': self.format_member_points_series(results_df['total_points'], trust_levels),
+                        'TA Pts': self.format_positive_series(results_df['time_attack_points']),
+                        'Race Pts': self.format_member_points_series(results_df['race_points'], trust_levels),
+                        'Pole Pts': self.format_positive_series(results_df['pole_points'], '%d'),
+                        'FLap Pts': self.format_positive_series(results_df['fastest_lap_points'], '%d'),
+                        'Drop Pts': self.format_positive_series(results_df['points_dropped']),
+                        'Bonus G Pts': self.format_signed_series(results_df['points_bonus']),
+                        'G+': self.format_positive_series(results_df['guests_beaten'], '%d'),
+                        'G-': self.format_positive_series(results_df['beaten_by_guests'], '%d')
+                    }))
 
                     # Applica stile: Total Pts in grassetto e verde, colonne statistiche con sfondo chiaro
-                    def highlight_competition_columns(s):
-                        # Colonne statistiche con sfondo chiaro
-                        stats_cols = ['G+', 'G-']
-                        if s.name in stats_cols:
-                            return ['background-color: #f0f2f6;' for _ in s]
-                        # Total Pts in grassetto e verde
-                        elif s.name == 'Total Pts':
-                            return ['font-weight: bold; color: green;' for _ in s]
-                        else:
-                            return ['' for _ in s]
-
-                    styled_results = results_display.style.apply(highlight_competition_columns, axis=0)
+                    styled_results = (
+                        results_display.style
+                        .set_properties(subset=['G+', 'G-'], **{'background-color': '#f0f2f6'})
+                        .set_properties(subset=['Total Pts'], **{'font-weight': 'bold', 'color': 'green'})
+                    )
 
                     st.dataframe(
                         styled_results,
@@ -1232,13 +1991,12 @@ class ACCWebDashboard:
                 sessions = self.get_competition_sessions(comp_id)
 
                 if sessions:
+                    # Risultati di tutte le sessioni con una sola query
+                    results_by_session = self.get_sessions_results([row[0] for row in sessions])
+
                     for session_id, session_type, session_date, session_order, total_drivers, best_lap_overall, best_lap_driver in sessions:
                         # Format data
-                        try:
-                            date_obj = datetime.fromisoformat(session_date.replace('Z', '+00:00'))
-                            date_str = date_obj.strftime('%d/%m/%Y %H:%M')
-                        except:
-                            date_str = session_date[:16] if session_date else 'N/A'
+                        date_str = self.format_session_datetime(session_date)
 
                         # Header sessione
                         best_lap_text = f'⚡ Best: {self.format_lap_time(best_lap_overall)} ({best_lap_driver})' if best_lap_overall and best_lap_driver else (f'⚡ Best: {self.format_lap_time(best_lap_overall)}' if best_lap_overall else '')
@@ -1251,58 +2009,21 @@ class ACCWebDashboard:
                         """, unsafe_allow_html=True)
 
                         # Risultati sessione
-                        session_results_df = self.get_session_results(session_id)
+                        session_results_df = results_by_session.get(session_id, pd.DataFrame())
 
                         if not session_results_df.empty:
-                            # Formatta risultati sessione
-                            session_display = session_results_df.copy()
-
-                            # Usa solo numeri per le posizioni
-                            session_display['Pos'] = session_display['position'].apply(
-                                lambda x: str(int(x)) if pd.notna(x) else "NC"
-                            )
-
-                            # Formatta tempo giro
-                            session_display['Best Lap'] = session_display['best_lap'].apply(
-                                lambda x: self.format_lap_time(x) if pd.notna(x) else "N/A"
-                            )
-
-                            # Formatta tempo totale
-                            session_display['Total Time'] = session_display['total_time'].apply(
-                                lambda x: self.format_lap_time(x) if pd.notna(x) else "N/A"
-                            )
-
-                            # Crea colonna Type con icona (persona per registrati, ghost per guest)
-                            session_display['Type'] = session_display['trust_level'].apply(
-                                lambda x: "👤" if x > 0 else "👻"
-                            )
-
-                            # Formatta colonna Car
-                            session_display['Car'] = session_display['car'].apply(
-                                lambda x: x if pd.notna(x) else "-"
-                            )
-
-                            # Seleziona colonne da mostrare (Driver prima di Num#)
-                            columns_to_show = ['Pos', 'driver', 'race_number', 'Car', 'Type', 'lap_count', 'Best Lap', 'Total Time', 'trust_level']
-                            column_names = {
-                                'Pos': 'Pos',
-                                'driver': 'Driver',
-                                'race_number': 'Num#',
-                                'Car': 'Car',
-                                'Type': 'Type',
-                                'lap_count': 'Laps',
-                                'Best Lap': 'Best Lap',
-                                'Total Time': 'Total Time',
-                                'trust_level': 'trust_level'  # Manteniamo per lo stile
-                            }
-
-                            session_display = session_display[columns_to_show]
-                            session_display.columns = [column_names[col] for col in columns_to_show]
-
-                            # Rimuovi colonna trust_level dalla visualizzazione finale
-                            final_columns = ['Pos', 'Driver', 'Num#', 'Car', 'Type', 'Laps', 'Best Lap', 'Total Time']
-                            session_display_final = session_display.drop(columns=['trust_level'])
-                            session_display_final.columns = final_columns
+                            # Tabella costruita direttamente dalle colonne formattate (Driver prima di Num#, solo numeri per le posizioni)
+                            session_display_final = self.to_arrow_strings(pd.DataFrame({
+                                'Pos': self.format_position_series(session_results_df['position'], medals=False),
+                                'Driver': session_results_df['driver'],
+                                'Num#': session_results_df['race_number'],
+                                'Car': session_results_df['car'].fillna("-"),
+                                # Icona tipo pilota (persona per registrati, ghost per guest)
+                                'Type': np.where(pd.to_numeric(session_results_df['trust_level'], errors='coerce') > 0, "👤", "👻"),
+                                'Laps': session_results_df['lap_count'],
+                                'Best Lap': self.format_lap_time_series(session_results_df['best_lap']),
+                                'Total Time': self.format_lap_time_series(session_results_df['total_time'])
+                            }))
 
                             # Configurazione larghezza colonne: colonne strette per Pos, Num#, Type, Laps
                             st.dataframe(
@@ -1322,8 +2043,6 @@ class ACCWebDashboard:
                 else:
                     st.info("ℹ️ No sessions found for this competition")
 
-            conn.close()
-
         except Exception as e:
             st.error(f"❌ Error loading Race Results data: {e}")
 
@@ -1332,35 +2051,11 @@ class ACCWebDashboard:
 
     def get_championship_standings(self, championship_id: int) -> pd.DataFrame:
         """Ottiene classifica campionato con tutti i dettagli"""
-        query = """
-            SELECT
-                cs.position,
-                d.last_name as driver,
-                cs.total_points,
-                cs.competitions_participated,
-                cs.wins,
-                cs.podiums,
-                cs.poles,
-                cs.fastest_laps,
-                cs.gross_points,
-                cs.points_dropped,
-                cs.base_points,
-                cs.participation_multiplier,
-                cs.participation_bonus,
-                COALESCE(SUM(CASE WHEN mp.is_active = 1 THEN mp.penalty_points ELSE 0 END), 0) as manual_penalties
-            FROM championship_standings cs
-            JOIN drivers d ON cs.driver_id = d.driver_id
-            LEFT JOIN manual_penalties mp ON cs.championship_id = mp.championship_id
-                AND cs.driver_id = mp.driver_id AND mp.is_active = 1
-            WHERE cs.championship_id = ?
-            GROUP BY cs.championship_id, cs.driver_id, cs.position, d.last_name,
-                     cs.total_points, cs.competitions_participated, cs.wins, cs.podiums,
-                     cs.poles, cs.fastest_laps, cs.gross_points, cs.points_dropped,
-                     cs.base_points, cs.participation_multiplier, cs.participation_bonus
-            ORDER BY cs.position
-        """
-        
-        return self.safe_sql_query(query, [championship_id])
+        try:
+            return load_championship_standings(self._conn, self.db_path, self.get_database_mtime(), championship_id)
+        except Exception as e:
+            st.error(f"❌ Errore nella query: {e}")
+            return pd.DataFrame()
     
     def show_leagues_report(self):
         """Mostra il report leagues"""
@@ -1368,56 +2063,31 @@ class ACCWebDashboard:
 
         # Ottieni lista leagues con conteggio standing
         try:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-
-            cursor.execute("""
-                SELECT
-                    l.league_id,
-                    l.name,
-                    l.season,
-                    l.start_date,
-                    l.end_date,
-                    l.total_tiers,
-                    l.is_completed,
-                    l.description,
-                    COUNT(ls.driver_id) as standings_count
-                FROM leagues l
-                LEFT JOIN league_standings ls ON l.league_id = ls.league_id
-                GROUP BY l.league_id
-                ORDER BY
-                    CASE WHEN l.start_date IS NULL THEN 1 ELSE 0 END,
-                    l.start_date DESC,
-                    l.league_id DESC
-            """)
-
-            leagues = cursor.fetchall()
+            db_mtime = self.get_database_mtime()
+            leagues = load_leagues_list(self._conn, self.db_path, db_mtime)
 
             if not leagues:
                 st.warning("❌ No leagues found in database")
-                conn.close()
                 return
 
             # Prepara opzioni per selectbox
             league_options = []
             league_map = {}
             default_league_index = 0  # Default: prima league
+            # Default index: più recente con classifica calcolata (cercata nello stesso ciclo)
+            first_with_standings_idx = None
 
-            for league_id, name, season, start_date, end_date, total_tiers, is_completed, description, standings_count in leagues:
+            for idx, league_row in enumerate(leagues):
+                league_id, name, season, start_date, end_date, total_tiers, is_completed, description, standings_count = league_row
                 # Formato display
                 status_str = " ✅" if is_completed else " 🔄"
                 season_str = f" - {season}" if season else ""
                 display_name = f"{name}{season_str}{status_str}"
                 league_options.append(display_name)
-                league_map[display_name] = league_id
-
-            # Trova default index: più recente con classifica calcolata
-            first_with_standings_idx = None
+                league_map[display_name] = league_row  # riga completa: contiene già i dettagli della league
 
-            for idx, (league_id, name, season, start_date, end_date, total_tiers, is_completed, description, standings_count) in enumerate(leagues):
                 if standings_count > 0 and first_with_standings_idx is None:
                     first_with_standings_idx = idx
-                    break
 
             # Seleziona la più recente con standing, altrimenti la prima in lista
             if first_with_standings_idx is not None:
@@ -1434,19 +2104,11 @@ class ACCWebDashboard:
                 key="league_selector"
             )
 
-            selected_league_id = league_map[selected_league_display]
-
-            # Ottieni dettagli league selezionata
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-
-            cursor.execute("""
-                SELECT name, season, start_date, end_date, total_tiers, is_completed, description
-                FROM leagues
-                WHERE league_id = ?
-            """, (selected_league_id,))
+            selected_league_row = league_map[selected_league_display]
+            selected_league_id = selected_league_row[0]
 
-            league_info = cursor.fetchone()
+            # Dettagli league selezionata (senza id e conteggio standing)
+            league_info = selected_league_row[1:8]
 
             if league_info:
                 name, season, start_date, end_date, total_tiers, is_completed, description = league_info
@@ -1454,15 +2116,6 @@ class ACCWebDashboard:
                 # Header league con stile championship-header
                 status_icon = "✅" if is_completed else "🔄"
 
-                # Costruisci l'HTML completo
-                header_html = f"""
-                <div class="championship-header">
-                    <h2>🌟 {name} {status_icon}</h2>
-                """
-
-                if description:
-                    header_html += f"<p style='margin-top: 10px;'>{description}</p>"
-
                 # Info aggiuntive
                 info_parts = []
                 if total_tiers:
@@ -1476,89 +2129,56 @@ class ACCWebDashboard:
                     except:
                         pass
 
-                if info_parts:
-                    header_html += f"<p style='margin-top: 10px;'>{' | '.join(info_parts)}</p>"
-
-                header_html += "</div>"
+                # Blocchi opzionali precalcolati, poi l'HTML completo in un solo f-string
+                description_block = f"<p style='margin-top: 10px;'>{description}</p>" if description else ""
+                info_block = f"<p style='margin-top: 10px;'>{' | '.join(info_parts)}</p>" if info_parts else ""
+                header_html = f"""
+                <div class="championship-header">
+                    <h2>🌟 {name} {status_icon}</h2>
+                {description_block}{info_block}</div>"""
 
                 st.markdown(header_html, unsafe_allow_html=True)
 
                 # Classifica league
                 st.subheader("🌟 League Standings")
 
-                query_standings = """
-                    SELECT
-                        ls.position,
-                        d.last_name as driver,
-                        ls.tier1_points,
-                        ls.tier2_points,
-                        ls.tier3_points,
-                        ls.tier4_points,
-                        ls.total_final_points,
-                        ls.consistency_cv,
-                        ls.consistency_bonus,
-                        ls.tiers_participated,
-                        ls.total_wins,
-                        ls.total_podiums,
-                        ls.total_poles,
-                        ls.total_fastest_laps
-                    FROM league_standings ls
-                    JOIN drivers d ON ls.driver_id = d.driver_id
-                    WHERE ls.league_id = ?
-                    ORDER BY ls.position ASC
-                """
-
-                df_standings = pd.read_sql_query(query_standings, conn, params=(selected_league_id,))
+                df_standings = load_league_standings(self._conn, self.db_path, db_mtime, selected_league_id)
 
                 if not df_standings.empty:
-                    # Formatta colonne
-                    df_display = df_standings.copy()
-                    df_display['position'] = df_display['position'].astype(int)
-
-                    # Rinomina colonne (nell'ordine originale della query)
-                    df_display.columns = ['Pos', 'Driver', 'Tier 1 Pts', 'Tier 2 Pts', 'Tier 3 Pts', 'Tier 4 Pts',
-                                         'Total Pts', 'CV%', 'Consist Pts', 'n Tiers', 'n Wins', 'n Pods', 'n Poles', 'n FLaps']
-
-                    # Formatta valori numerici: trattini per zeri, decimali per valori > 0
-                    df_display['Tier 1 Pts'] = df_display['Tier 1 Pts'].apply(lambda x: f"{x:.1f}" if pd.notna(x) and x > 0 else "-")
-                    df_display['Tier 2 Pts'] = df_display['Tier 2 Pts'].apply(lambda x: f"{x:.1f}" if pd.notna(x) and x > 0 else "-")
-                    df_display['Tier 3 Pts'] = df_display['Tier 3 Pts'].apply(lambda x: f"{x:.1f}" if pd.notna(x) and x > 0 else "-")
-                    df_display['Tier 4 Pts'] = df_display['Tier 4 Pts'].apply(lambda x: f"{x:.1f}" if pd.notna(x) and x > 0 else "-")
-                    df_display['Total Pts'] = df_display['Total Pts'].apply(lambda x: f"{x:.1f}" if pd.notna(x) else "0.0")
-                    # CV% in percentuale (moltiplicato per 100)
-                    df_display['CV%'] = df_display['CV%'].apply(lambda x: f"{x*100:.1f}%" if pd.notna(x) and x > 0 else "-")
-                    df_display['Consist Pts'] = df_display['Consist Pts'].apply(lambda x: f"{x:.1f}" if pd.notna(x) and x > 0 else "-")
-                    # Formatta statistiche: trattini per zeri
-                    df_display['n Tiers'] = df_display['n Tiers'].apply(lambda x: str(int(x)) if pd.notna(x) and x > 0 else "-")
-                    df_display['n Wins'] = df_display['n Wins'].apply(lambda x: str(int(x)) if pd.notna(x) and x > 0 else "-")
-                    df_display['n Pods'] = df_display['n Pods'].apply(lambda x: str(int(x)) if pd.notna(x) and x > 0 else "-")
-                    df_display['n Poles'] = df_display['n Poles'].apply(lambda x: str(int(x)) if pd.notna(x) and x > 0 else "-")
-                    df_display['n FLaps'] = df_display['n FLaps'].apply(lambda x: str(int(x)) if pd.notna(x) and x > 0 else "-")
-
-                    # Riordina colonne: Pos, Driver, Total Pts, Tier 1-4, CV%, Consist, n Tiers, n Wins, n Pods, n Poles, n FLaps
-                    column_order = ['Pos', 'Driver', 'Total Pts', 'Tier 1 Pts', 'Tier 2 Pts', 'Tier 3 Pts', 'Tier 4 Pts',
-                                   'CV%', 'Consist Pts', 'n Tiers', 'n Wins', 'n Pods', 'n Poles', 'n FLaps']
-                    df_display = df_display[column_order]
+                    # Tabella costruita direttamente dalle colonne formattate, nell'ordine di visualizzazione
+                    # Punti tier e consistency: trattini per zeri, decimali per valori > 0; statistiche: trattini per zeri
+                    df_display = self.to_arrow_strings(pd.DataFrame({
+                        'Pos': df_standings['position'].astype(int),
+                        'Driver': df_standings['driver'],
+                        # Total Pts resta numerico (NaN -> 0): lo formatta lo Styler
+                        'Total Pts': pd.to_numeric(df_standings['total_final_points'], errors='coerce').fillna(0.0),
+                        'Tier 1 Pts': self.format_positive_series(df_standings['tier1_points']),
+                        'Tier 2 Pts': self.format_positive_series(df_standings['tier2_points']),
+                        'Tier 3 Pts': self.format_positive_series(df_standings['tier3_points']),
+                        'Tier 4 Pts': self.format_positive_series(df_standings['tier4_points']),
+                        # CV% in percentuale (moltiplicato per 100)
+                        'CV%': self.format_positive_series(df_standings['consistency_cv'] * 100, '%.1f%%'),
+                        'Consist Pts': self.format_positive_series(df_standings['consistency_bonus']),
+                        'n Tiers': self.format_positive_series(df_standings['tiers_participated'], '%d'),
+                        'n Wins': self.format_positive_series(df_standings['total_wins'], '%d'),
+                        'n Pods': self.format_positive_series(df_standings['total_podiums'], '%d'),
+                        'n Poles': self.format_positive_series(df_standings['total_poles'], '%d'),
+                        'n FLaps': self.format_positive_series(df_standings['total_fastest_laps'], '%d')
+                    }))
 
                     # Applica stile: Total Pts in grassetto e verde, colonne statistiche con sfondo chiaro
-                    def highlight_league_columns(s):
-                        # Colonne statistiche con sfondo chiaro (incluso CV%)
-                        stats_cols = ['CV%', 'n Tiers', 'n Wins', 'n Pods', 'n Poles', 'n FLaps']
-                        if s.name in stats_cols:
-                            return ['background-color: #f0f2f6;' for _ in s]
-                        # Total Pts in grassetto e verde
-                        elif s.name == 'Total Pts':
-                            return ['font-weight: bold; color: green;' for _ in s]
-                        else:
-                            return ['' for _ in s]
-
-                    styled_league = df_display.style.apply(highlight_league_columns, axis=0)
+                    styled_league = (
+                        df_display.style
+                        .format({'Total Pts': '{:.1f}'})
+                        .set_properties(subset=['CV%', 'n Tiers', 'n Wins', 'n Pods', 'n Poles', 'n FLaps'], **{'background-color': '#f0f2f6'})
+                        .set_properties(subset=['Total Pts'], **{'font-weight': 'bold', 'color': 'green'})
+                    )
 
                     # Configura larghezza colonne (in pixel)
                     column_config = {
                         'Pos': st.column_config.TextColumn('Pos', width=60),
                         'Driver': st.column_config.TextColumn('Driver', width=150),
-                        'Total Pts': st.column_config.TextColumn('Total Pts', width=80),
+                        'Total Pts': st.column_config.NumberColumn('Total Pts', width=80, format='%.1f'),
                         'Tier 1 Pts': st.column_config.TextColumn('Tier 1 Pts', width=80),
                         'Tier 2 Pts': st.column_config.TextColumn('Tier 2 Pts', width=80),
                         'Tier 3 Pts': st.column_config.TextColumn('Tier 3 Pts', width=80),
@@ -1587,50 +2207,28 @@ class ACCWebDashboard:
                 st.subheader("Tiers")
 
                 # Ottieni championships (tier) della lega con conteggio standing
-                cursor.execute("""
-                    SELECT
-                        c.championship_id,
-                        c.name,
-                        c.tier_number,
-                        c.start_date,
-                        c.end_date,
-                        c.is_completed,
-                        c.description,
-                        COUNT(cs.driver_id) as standings_count
-                    FROM championships c
-                    LEFT JOIN championship_standings cs ON c.championship_id = cs.championship_id
-                    WHERE c.league_id = ? AND c.championship_type = 'tier'
-                    GROUP BY c.championship_id
-                    ORDER BY
-                        CASE WHEN c.start_date IS NULL THEN 1 ELSE 0 END,
-                        c.start_date DESC,
-                        c.championship_id DESC
-                """, (selected_league_id,))
-
-                tier_championships = cursor.fetchall()
+                tier_championships = load_tier_championships(self._conn, self.db_path, db_mtime, selected_league_id)
 
                 if tier_championships:
                     # Prepara opzioni per selectbox tier
                     tier_options = ["Select a tier..."]
                     tier_map = {}
                     default_tier_index = 1  # Default al primo tier (dopo "Select a tier...")
+                    # Default index: più recente con classifica calcolata (cercata nello stesso ciclo)
+                    first_with_standings_idx = None
 
-                    for idx, (champ_id, champ_name, tier_num, date_start, date_end, is_completed, desc, standings_count) in enumerate(tier_championships):
+                    for idx, tier_row in enumerate(tier_championships):
+                        champ_id, champ_name, tier_num, date_start, date_end, is_completed, desc, standings_count, _, _ = tier_row
                         # Formato display
                         status_str = " ✅" if is_completed else " 🔄"
                         date_str = f" ({date_start[:10]})" if date_start else ""
                         display_name = f"Tier {tier_num} - {champ_name}{date_str}{status_str}"
 
                         tier_options.append(display_name)
-                        tier_map[display_name] = champ_id
-
-                    # Trova default index: più recente con classifica calcolata
-                    first_with_standings_idx = None
+                        tier_map[display_name] = tier_row  # riga completa: niente ricerca lineare dopo la selezione
 
-                    for idx, (champ_id, champ_name, tier_num, date_start, date_end, is_completed, desc, standings_count) in enumerate(tier_championships):
                         if standings_count > 0 and first_with_standings_idx is None:
                             first_with_standings_idx = idx + 1  # +1 per "Select a tier..."
-                            break
 
                     # Seleziona il più recente con standing, altrimenti il primo in lista
                     if first_with_standings_idx is not None:
@@ -1647,30 +2245,20 @@ class ACCWebDashboard:
                     )
 
                     if selected_tier and selected_tier != "Select a tier...":
-                        tier_championship_id = tier_map[selected_tier]
-
-                        # Trova info tier selezionato
-                        selected_tier_info = next(
-                            (t for t in tier_championships if t[0] == tier_championship_id),
-                            None
-                        )
+                        # Info tier selezionato direttamente dalla mappa
+                        selected_tier_info = tier_map[selected_tier]
+                        tier_championship_id = selected_tier_info[0]
 
                         if selected_tier_info:
-                            champ_id, champ_name, tier_num, date_start, date_end, is_completed, desc, standings_count = selected_tier_info
+                            champ_id, champ_name, tier_num, date_start, date_end, is_completed, desc, standings_count, drop_worst, total_rounds = selected_tier_info
 
                             # Header tier championship
+                            desc_block = f"<p>{desc}</p>" if desc else ""
+                            dates_block = f"<p>📅 {date_start} - {date_end}</p>" if date_start and date_end else ""
                             tier_header = f"""
                             <div class="championship-header">
                                 <h3>🏆 Tier {tier_num} - {champ_name}</h3>
-                            """
-
-                            if desc:
-                                tier_header += f"<p>{desc}</p>"
-
-                            if date_start and date_end:
-                                tier_header += f"<p>📅 {date_start} - {date_end}</p>"
-
-                            tier_header += "</div>"
+                            {desc_block}{dates_block}</div>"""
 
                             st.markdown(tier_header, unsafe_allow_html=True)
 
@@ -1679,101 +2267,53 @@ class ACCWebDashboard:
                             standings_df = self.get_championship_standings(tier_championship_id)
 
                             if not standings_df.empty:
-                                # Ottieni drop_worst_results e total_rounds per questo championship
-                                cursor.execute("""
-                                    SELECT COALESCE(ps.drop_worst_results, 0) as drop_worst,
-                                           ch.total_rounds
-                                    FROM competitions c
-                                    LEFT JOIN points_systems ps ON c.points_system_json = ps.name
-                                    JOIN championships ch ON c.championship_id = ch.championship_id
-                                    WHERE c.championship_id = ?
-                                    LIMIT 1
-                                """, (tier_championship_id,))
-
-                                result = cursor.fetchone()
-                                drop_worst = result[0] if result else 0
-                                total_rounds = result[1] if result and result[1] else 0
+                                # drop_worst_results e total_rounds arrivano già con la riga del tier (NULL senza competizioni)
+                                drop_worst = drop_worst or 0
+                                total_rounds = total_rounds or 0
 
                                 # Calcola il numero minimo di gare che vengono conteggiate
                                 counted_races = max(0, total_rounds - drop_worst) if total_rounds > 0 else 0
 
-                                # Formatta classifica per visualizzazione
-                                standings_display = standings_df.copy()
-
-                                # Aggiungi medaglie per primi 3
-                                standings_display['Pos'] = standings_display['position'].apply(
-                                    lambda x: "🥇" if x == 1 else "🥈" if x == 2 else "🥉" if x == 3 else str(x)
-                                )
-
-                                # Formatta points_dropped PRIMA di convertire competitions_participated in stringa
-                                def format_dropped_points(row):
-                                    races = row['competitions_participated']
-                                    dropped_pts = row['points_dropped']
-
-                                    if pd.notna(dropped_pts) and dropped_pts > 0:
-                                        return f"-{dropped_pts:.1f}"
-                                    elif counted_races > 0 and races > counted_races:
-                                        return "0.0"
-                                    else:
-                                        return "-"
-
-                                standings_display['points_dropped'] = standings_display.apply(format_dropped_points, axis=1)
-
-                                # Formatta i valori numerici - usa "-" per zero/null
-                                standings_display['competitions_participated'] = standings_display['competitions_participated'].apply(lambda x: str(int(x)) if pd.notna(x) and x > 0 else "-")
-                                standings_display['wins'] = standings_display['wins'].apply(lambda x: str(int(x)) if pd.notna(x) and x > 0 else "-")
-                                standings_display['podiums'] = standings_display['podiums'].apply(lambda x: str(int(x)) if pd.notna(x) and x > 0 else "-")
-                                standings_display['poles'] = standings_display['poles'].apply(lambda x: str(int(x)) if pd.notna(x) and x > 0 else "-")
-                                standings_display['fastest_laps'] = standings_display['fastest_laps'].apply(lambda x: str(int(x)) if pd.notna(x) and x > 0 else "-")
-                                standings_display['gross_points'] = standings_display['gross_points'].apply(lambda x: f"{x:.1f}" if pd.notna(x) else "0.0")
-                                standings_display['manual_penalties'] = standings_display['manual_penalties'].apply(lambda x: f"-{x:.0f}" if pd.notna(x) and x > 0 else "-")
-                                standings_display['total_points'] = standings_display['total_points'].apply(lambda x: f"{x:.1f}" if pd.notna(x) else "0.0")
-
-                                # Seleziona colonne da mostrare nell'ordine richiesto: Pos, Driver, Total, Gross, Drop, Pen | n Comps, n Wins, n Pods, n Poles, n FLaps
-                                columns_to_show = [
-                                    'Pos', 'driver', 'total_points', 'gross_points', 'points_dropped',
-                                    'manual_penalties', 'competitions_participated', 'wins', 'podiums',
-                                    'poles', 'fastest_laps'
-                                ]
-
-                                # Rinomina colonne con i nomi corti
-                                column_names = {
-                                    'Pos': 'Pos',
-                                    'driver': 'Driver',
-                                    'total_points': 'Total Pts',
-                                    'gross_points': 'Gross Pts',
-                                    'points_dropped': 'Drop Pts',
-                                    'manual_penalties': 'Pen Pts',
-                                    'competitions_participated': 'n Comps',
-                                    'wins': 'n Wins',
-                                    'podiums': 'n Pods',
-                                    'poles': 'n Poles',
-                                    'fastest_laps': 'n FLaps'
-                                }
-
-                                standings_display = standings_display[columns_to_show]
-                                standings_display.columns = [column_names[col] for col in columns_to_show]
+                                # Punti scartati: "-x.x" se > 0, "0.0" se il pilota ha più gare di quelle conteggiate
+                                races = pd.to_numeric(standings_df['competitions_participated'], errors='coerce').to_numpy(dtype=float)
+                                dropped_pts = pd.to_numeric(standings_df['points_dropped'], errors='coerce').to_numpy(dtype=float)
+                                points_dropped = np.select(
+                                    [dropped_pts > 0, (counted_races > 0) & (races > counted_races)],
+                                    [np.char.mod('-%.1f', np.nan_to_num(dropped_pts)), "0.0"],
+                                    default="-"
+                                ).astype(object)
+
+                                # Tabella costruita direttamente dalle colonne formattate: Pos, Driver, Total, Gross, Drop, Pen | n Comps, n Wins, n Pods, n Poles, n FLaps
+                                # Contatori e penalità: "-" per zero/null
+                                standings_display = self.to_arrow_strings(pd.DataFrame({
+                                    'Pos': self.format_position_series(standings_df['position']),
+                                    'Driver': standings_df['driver'],
+                                    # Total e Gross restano numerici (NaN -> 0): li formatta lo Styler
+                                    'Total Pts': pd.to_numeric(standings_df['total_points'], errors='coerce').fillna(0.0),
+                                    'Gross Pts': pd.to_numeric(standings_df['gross_points'], errors='coerce').fillna(0.0),
+                                    'Drop Pts': points_dropped,
+                                    'Pen Pts': self.format_positive_series(standings_df['manual_penalties'], '-%.0f'),
+                                    'n Comps': self.format_positive_series(standings_df['competitions_participated'], '%d'),
+                                    'n Wins': self.format_positive_series(standings_df['wins'], '%d'),
+                                    'n Pods': self.format_positive_series(standings_df['podiums'], '%d'),
+                                    'n Poles': self.format_positive_series(standings_df['poles'], '%d'),
+                                    'n FLaps': self.format_positive_series(standings_df['fastest_laps'], '%d')
+                                }))
 
                                 # Applica stile: Total Pts in grassetto e verde, colonne statistiche con sfondo chiaro
-                                def highlight_columns(s):
-                                    # Colonne statistiche con sfondo chiaro
-                                    stats_cols = ['n Comps', 'n Wins', 'n Pods', 'n Poles', 'n FLaps']
-                                    if s.name in stats_cols:
-                                        return ['background-color: #f0f2f6;' for _ in s]
-                                    # Total Pts in grassetto e verde
-                                    elif s.name == 'Total Pts':
-                                        return ['font-weight: bold; color: green;' for _ in s]
-                                    else:
-                                        return ['' for _ in s]
-
-                                styled_standings = standings_display.style.apply(highlight_columns, axis=0)
+                                styled_standings = (
+                                    standings_display.style
+                                    .format({'Total Pts': '{:.1f}', 'Gross Pts': '{:.1f}'})
+                                    .set_properties(subset=['n Comps', 'n Wins', 'n Pods', 'n Poles', 'n FLaps'], **{'background-color': '#f0f2f6'})
+                                    .set_properties(subset=['Total Pts'], **{'font-weight': 'bold', 'color': 'green'})
+                                )
 
                                 # Configura larghezza colonne (in pixel)
                                 column_config = {
                                     'Pos': st.column_config.TextColumn('Pos', width=60),
                                     'Driver': st.column_config.TextColumn('Driver', width=150),
-                                    'Total Pts': st.column_config.TextColumn('Total Pts', width=80),
-                                    'Gross Pts': st.column_config.TextColumn('Gross Pts', width=80),
+                                    'Total Pts': st.column_config.NumberColumn('Total Pts', width=80, format='%.1f'),
+                                    'Gross Pts': st.column_config.NumberColumn('Gross Pts', width=80, format='%.1f'),
                                     'Drop Pts': st.column_config.TextColumn('Drop Pts', width=70),
                                     'Pen Pts': st.column_config.TextColumn('Pen Pts', width=70),
                                     'n Comps': st.column_config.TextColumn('n Comps', width=70),
@@ -1801,74 +2341,46 @@ class ACCWebDashboard:
                 st.subheader("📈 Daily Participation Trend")
 
                 try:
-                    # Query per ottenere le date di fine competizione
-                    cursor.execute("""
-                        SELECT DISTINCT c.date_end, c.name
-                        FROM competitions c
-                        WHERE c.championship_id IN (
-                            SELECT championship_id
-                            FROM championships
-                            WHERE league_id = ?
-                        )
-                        AND c.date_end IS NOT NULL
-                        ORDER BY c.date_end ASC
-                    """, (selected_league_id,))
-
-                    competition_end_dates = cursor.fetchall()
-
-                    # Query per contare partecipanti unici per giorno (separati per registrati e guest)
-                    cursor.execute("""
-                        SELECT
-                            SUBSTR(s.filename, 1, 6) as date_str,
-                            COUNT(DISTINCT CASE WHEN d.trust_level > 0 THEN sr.driver_id END) as registered_participants,
-                            COUNT(DISTINCT CASE WHEN d.trust_level = 0 THEN sr.driver_id END) as guest_participants
-                        FROM sessions s
-                        JOIN session_results sr ON s.session_id = sr.session_id
-                        JOIN drivers d ON sr.driver_id = d.driver_id
-                        WHERE s.competition_id IN (
-                            SELECT competition_id
-                            FROM competitions
-                            WHERE championship_id IN (
-                                SELECT championship_id
-                                FROM championships
-                                WHERE league_id = ?
-                            )
-                        )
-                        GROUP BY SUBSTR(s.filename, 1, 6)
-                        ORDER BY date_str ASC
-                    """, (selected_league_id,))
+                    # Date di fine competizione e partecipanti per giorno (cache per league)
+                    competition_end_dates = load_league_competition_end_dates(self._conn, self.db_path, db_mtime, selected_league_id)
+                    dates, registered, guests = load_league_participation_trend(self._conn, self.db_path, db_mtime, selected_league_id)
 
-                    participation_data = cursor.fetchall()
+                    if len(dates):
+                        # Crea il grafico con Plotly (import differito: serve solo qui)
+                        import plotly.graph_objects as go
 
-                    if participation_data:
-                        # Converti i dati per il grafico
-                        dates = []
-                        registered = []
-                        guests = []
+                        fig = go.Figure()
+                        # Storici lunghi: WebGL invece di un nodo SVG per marker
+                        trace_cls = go.Scattergl if len(dates) > SCATTERGL_MIN_POINTS else go.Scatter
 
-                        for date_str, reg_count, guest_count in participation_data:
-                            # Converti YYMMDD in formato leggibile
+                        # Date di fine competizione nel formato dell'asse X (dd/mm/YYYY), senza duplicati
+                        end_dates = []
+                        for date_end, comp_name in competition_end_dates:
                             try:
-                                # Aggiungi "20" per completare l'anno (es. 251015 -> 20251015)
-                                full_date_str = "20" + date_str
-                                date_obj = datetime.strptime(full_date_str, "%Y%m%d")
-                                formatted_date = date_obj.strftime("%d/%m/%Y")
-                                dates.append(formatted_date)
-                                registered.append(reg_count if reg_count else 0)
-                                guests.append(guest_count if guest_count else 0)
-                            except:
-                                # Se la conversione fallisce, usa la stringa originale
-                                dates.append(date_str)
-                                registered.append(reg_count if reg_count else 0)
-                                guests.append(guest_count if guest_count else 0)
-
-                        # Crea il grafico con Plotly
-                        fig = go.Figure()
+                                if 'T' in date_end or 'Z' in date_end:
+                                    date_obj = datetime.fromisoformat(date_end.replace('Z', '+00:00'))
+                                else:
+                                    date_obj = datetime.strptime(date_end, "%Y-%m-%d")
+                            except Exception:
+                                # Se la conversione fallisce, salta questa data
+                                continue
+
+                            formatted_date = date_obj.strftime("%d/%m/%Y")
+                            if formatted_date not in end_dates:
+                                end_dates.append(formatted_date)
+
+                        # Storici lunghi: nel grafico solo i punti scelti da LTTB sul totale partecipanti,
+                        # più i giorni di fine competizione (l'asse è categorico: senza il punto la linea sparirebbe)
+                        # (le statistiche sotto il grafico restano sulla serie completa)
+                        plot_dates, plot_registered, plot_guests = dates, registered, guests
+                        if len(dates) > SCATTERGL_MIN_POINTS:
+                            keep = np.union1d(self.downsample_lttb(registered + guests), np.flatnonzero(np.isin(dates, end_dates)))
+                            plot_dates, plot_registered, plot_guests = dates[keep], registered[keep], guests[keep]
 
                         # Linea per piloti registrati - BLU SOLIDA
-                        fig.add_trace(go.Scatter(
-                            x=dates,
-                            y=registered,
+                        fig.add_trace(trace_cls(
+                            x=plot_dates,
+                            y=plot_registered,
                             mode='lines+markers',
                             name='Registered Drivers',
                             line=dict(color='#007bff', width=3),
@@ -1877,9 +2389,9 @@ class ACCWebDashboard:
                         ))
 
                         # Linea per piloti guest - ROSSO LONGDASH
-                        fig.add_trace(go.Scatter(
-                            x=dates,
-                            y=guests,
+                        fig.add_trace(trace_cls(
+                            x=plot_dates,
+                            y=plot_guests,
                             mode='lines+markers',
                             name='Guest Drivers',
                             line=dict(color='#dc3545', width=3, dash='longdash'),
@@ -1887,38 +2399,25 @@ class ACCWebDashboard:
                             hovertemplate='<b>Guests:</b> %{y}<extra></extra>'
                         ))
 
-                        # Aggiungi shapes (linee verticali) per le date di fine competizione
-                        shapes = []
-                        added_dates = set()  # Per evitare duplicati
-                        for date_end, comp_name in competition_end_dates:
-                            try:
-                                # Converti date_end (YYYY-MM-DD) in formato visualizzato nel grafico (dd/mm/YYYY)
-                                if 'T' in date_end or 'Z' in date_end:
-                                    date_obj = datetime.fromisoformat(date_end.replace('Z', '+00:00'))
-                                else:
-                                    date_obj = datetime.strptime(date_end, "%Y-%m-%d")
-
-                                formatted_date = date_obj.strftime("%d/%m/%Y")
-
-                                # Aggiungi shape solo se la data esiste nell'asse X e non è già presente
-                                if formatted_date in dates and formatted_date not in added_dates:
-                                    shapes.append(dict(
-                                        type="line",
-                                        x0=formatted_date,
-                                        x1=formatted_date,
-                                        y0=0,
-                                        y1=1,
-                                        yref="paper",
-                                        line=dict(
-                                            color="rgba(255, 165, 0, 0.6)",
-                                            width=2,
-                                            dash="dash"
-                                        )
-                                    ))
-                                    added_dates.add(formatted_date)
-                            except Exception as e:
-                                # Se la conversione fallisce, salta questa data
-                                pass
+                        # Aggiungi shapes (linee verticali) per le date di fine competizione presenti sull'asse X
+                        plotted_dates = set(plot_dates)
+                        shapes = [
+                            dict(
+                                type="line",
+                                x0=formatted_date,
+                                x1=formatted_date,
+                                y0=0,
+                                y1=1,
+                                yref="paper",
+                                line=dict(
+                                    color="rgba(255, 165, 0, 0.6)",
+                                    width=2,
+                                    dash="dash"
+                                )
+                            )
+                            for formatted_date in end_dates
+                            if formatted_date in plotted_dates
+                        ]
 
                         fig.update_layout(
                             title={
@@ -1929,6 +2428,7 @@ class ACCWebDashboard:
                             xaxis_title="Date",
                             yaxis_title="Number of Unique Participants",
                             hovermode='x unified',
+                            uirevision=selected_league_id,  # zoom e pan conservati tra i rerun della stessa league
                             template='plotly_dark',
                             height=500,
                             showlegend=True,
@@ -1952,20 +2452,16 @@ class ACCWebDashboard:
 
                         st.plotly_chart(fig, use_container_width=True)
 
-                        # Statistiche aggiuntive
+                        # Statistiche aggiuntive (riduzioni NumPy sulla serie completa)
                         col1, col2, col3, col4 = st.columns(4)
                         with col1:
-                            avg_registered = sum(registered) / len(registered)
-                            st.metric("Avg Registered", f"{avg_registered:.1f}")
+                            st.metric("Avg Registered", f"{registered.mean():.1f}")
                         with col2:
-                            avg_guests = sum(guests) / len(guests)
-                            st.metric("Avg Guests", f"{avg_guests:.1f}")
+                            st.metric("Avg Guests", f"{guests.mean():.1f}")
                         with col3:
-                            max_registered = max(registered)
-                            st.metric("Peak Registered", f"{max_registered}")
+                            st.metric("Peak Registered", f"{registered.max()}")
                         with col4:
-                            max_guests = max(guests)
-                            st.metric("Peak Guests", f"{max_guests}")
+                            st.metric("Peak Guests", f"{guests.max()}")
 
                     else:
                         st.info("ℹ️ No participation data available for this league yet")
@@ -1973,16 +2469,19 @@ class ACCWebDashboard:
                 except Exception as e:
                     st.error(f"❌ Error loading participation trend: {e}")
 
-            conn.close()
-
         except Exception as e:
             st.error(f"❌ Error loading leagues: {e}")
 
 
     # ==================== ALL SESSIONS ====================
 
-    def format_session_datetime(self, session_date: str) -> str:
+    @staticmethod
+    @lru_cache(maxsize=4096)
+    def format_session_datetime(session_date: str) -> str:
         """Formatta data e ora sessione per visualizzazione"""
+        if isinstance(session_date, str) and ISO_DATETIME_RE.match(session_date):
+            return f"{session_date[8:10]}/{session_date[5:7]}/{session_date[0:4]} {session_date[11:16]}"
+        
         try:
             date_obj = datetime.fromisoformat(session_date.replace('Z', '+00:00'))
             return date_obj.strftime('%d/%m/%Y %H:%M')
@@ -1990,137 +2489,33 @@ class ACCWebDashboard:
             return session_date[:16] if session_date else 'N/A'
 
     def get_sessions_statistics(self, date_from: date, date_to: date) -> Dict:
-        """Ottiene statistiche sessioni per il periodo specificato - VERSIONE CORRETTA"""
+        """Ottiene statistiche sessioni per il periodo specificato (cache per periodo)"""
         try:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-            
             # Converti date in string per query SQL
             date_from_str = date_from.strftime('%Y-%m-%d')
             date_to_str = (date_to + timedelta(days=1)).strftime('%Y-%m-%d')  # Include tutto il giorno 'to'
             
-            # CORREZIONE: Statistiche sessioni separate dai driver
-            # 1. Statistiche sessioni (senza JOIN con session_results)
-            cursor.execute('''
-                SELECT 
-                    COUNT(*) as total_sessions,
-                    COUNT(CASE WHEN competition_id IS NOT NULL THEN 1 END) as official_sessions,
-                    COUNT(CASE WHEN competition_id IS NULL THEN 1 END) as non_official_sessions
-                FROM sessions s
-                WHERE DATE(s.session_date) >= ? AND DATE(s.session_date) < ?
-            ''', (date_from_str, date_to_str))
-            
-            session_result = cursor.fetchone()
-            total_sessions, official, non_official = session_result
-            
-            # 2. Piloti unici separatamente
-            cursor.execute('''
-                SELECT 
-                    COUNT(DISTINCT sr.driver_id) as unique_drivers
-                FROM sessions s
-                JOIN session_results sr ON s.session_id = sr.session_id
-                WHERE DATE(s.session_date) >= ? AND DATE(s.session_date) < ?
-            ''', (date_from_str, date_to_str))
-            
-            driver_result = cursor.fetchone()
-            unique_drivers = driver_result[0] if driver_result else 0
-            
-            # Circuito con più sessioni (rimane invariato)
-            cursor.execute('''
-                SELECT 
-                    track_name,
-                    COUNT(*) as session_count
-                FROM sessions s
-                WHERE DATE(s.session_date) >= ? AND DATE(s.session_date) < ?
-                GROUP BY track_name
-                ORDER BY session_count DESC
-                LIMIT 1
-            ''', (date_from_str, date_to_str))
-            
-            track_result = cursor.fetchone()
-            most_used_track = track_result[0] if track_result else "N/A"
-            most_used_count = track_result[1] if track_result else 0
-            
-            # Ultima sessione (rimane invariato)
-            cursor.execute('''
-                SELECT 
-                    track_name,
-                    session_date,
-                    session_type
-                FROM sessions s
-                WHERE DATE(s.session_date) >= ? AND DATE(s.session_date) < ?
-                ORDER BY s.session_date DESC
-                LIMIT 1
-            ''', (date_from_str, date_to_str))
-            
-            last_result = cursor.fetchone()
-            
-            conn.close()
-            
-            return {
-                'total_sessions': total_sessions or 0,
-                'unique_drivers': unique_drivers or 0,
-                'official_sessions': official or 0,
-                'non_official_sessions': non_official or 0,
-                'most_used_track': most_used_track,
-                'most_used_count': most_used_count,
-                'last_session_track': last_result[0] if last_result else "N/A",
-                'last_session_date': last_result[1] if last_result else None,
-                'last_session_type': last_result[2] if last_result else "N/A"
-            }
+            return load_sessions_statistics(self._conn, self.db_path, self.get_database_mtime(), date_from_str, date_to_str)
             
         except Exception as e:
             st.error(f"❌ Error retrieving sessions statistics: {e}")
             return {}
     
-    def get_sessions_list_with_details(self, date_from: date, date_to: date) -> pd.DataFrame:
-        """Ottiene lista sessioni con dettagli per il periodo specificato"""
-        date_from_str = date_from.strftime('%Y-%m-%d')
-        date_to_str = (date_to + timedelta(days=1)).strftime('%Y-%m-%d')
-        
-        query = '''
-            SELECT
-                s.session_id,
-                s.session_type,
-                s.track_name,
-                s.session_date,
-                s.total_drivers,
-                s.competition_id,
-                s.is_time_attack,
-                -- Fastest driver info (migliore giro)
-                fastest.driver_name as fastest_name,
-                fastest.best_lap as fastest_time,
-                -- Competition info se disponibile
-                c.name as competition_name,
-                c.round_number
-            FROM sessions s
-            LEFT JOIN (
-                SELECT
-                    sr.session_id,
-                    d.last_name as driver_name,
-                    sr.best_lap
-                FROM session_results sr
-                JOIN drivers d ON sr.driver_id = d.driver_id
-                WHERE sr.best_lap > 0
-                AND sr.best_lap = (
-                    SELECT MIN(sr2.best_lap)
-                    FROM session_results sr2
-                    WHERE sr2.session_id = sr.session_id
-                    AND sr2.best_lap > 0
-                )
-                GROUP BY sr.session_id
-            ) fastest ON s.session_id = fastest.session_id
-            LEFT JOIN competitions c ON s.competition_id = c.competition_id
-            WHERE DATE(s.session_date) >= ? AND DATE(s.session_date) < ?
-            ORDER BY s.session_date DESC
-        '''
+    def get_sessions_list_with_details(self, date_from: date, date_to: date) -> pd.DataFrame:
+        """Ottiene lista sessioni con dettagli per il periodo specificato (cache per periodo)"""
+        date_from_str = date_from.strftime('%Y-%m-%d')
+        date_to_str = (date_to + timedelta(days=1)).strftime('%Y-%m-%d')
         
-        return self.safe_sql_query(query, [date_from_str, date_to_str])
+        try:
+            return load_sessions_list(self._conn, self.db_path, self.get_database_mtime(), date_from_str, date_to_str)
+        except Exception as e:
+            st.error(f"❌ Errore nella query: {e}")
+            return pd.DataFrame()
     
     def get_session_info(self, session_id: str) -> Optional[Tuple]:
         """Ottiene informazioni base della sessione"""
         try:
-            conn = sqlite3.connect(self.db_path)
+            conn = self._conn
             cursor = conn.cursor()
             
             cursor.execute('''
@@ -2138,7 +2533,6 @@ class ACCWebDashboard:
             ''', (session_id,))
             
             result = cursor.fetchone()
-            conn.close()
             
             return result
             
@@ -2195,19 +2589,11 @@ class ACCWebDashboard:
         session_options = ["📊 General Summary"]
         session_map = {}
         
-        # Prepara opzioni ordinate per data/ora decrescente (più recenti prima)
-        sessions_sorted = sessions_list.sort_values('session_date', ascending=False)
-        
-        for idx, row in sessions_sorted.iterrows():
+        # Opzioni per data/ora decrescente (più recenti prima): ordine e data formattata arrivano dalla query
+        for idx, row in sessions_list.iterrows():
             session_id = row['session_id']
             track_name = row['track_name']
-            
-            # Formatta data e ora per visualizzazione
-            try:
-                date_obj = datetime.fromisoformat(row['session_date'].replace('Z', '+00:00'))
-                datetime_str = date_obj.strftime('%d/%m/%Y %H:%M')
-            except:
-                datetime_str = row['session_date'][:16] if row['session_date'] else 'N/A'
+            datetime_str = row['session_datetime_str']
             
             # Status: Time Attack, Official, o Unofficial
             if pd.notna(row.get('is_time_attack')) and row['is_time_attack'] == 1:
@@ -2261,29 +2647,23 @@ class ACCWebDashboard:
         display_df['Session'] = display_df['session_id']
         
         # Tipo sessione formattato
-        display_df['Type'] = display_df['session_type'].apply(
-            lambda x: self.format_session_type(x) if pd.notna(x) else "N/A"
-        )
+        display_df['Type'] = self.format_session_type_series(display_df['session_type']).fillna("N/A")
         
         # Status: Time Attack, Official, o Unofficial
-        display_df['Status'] = display_df.apply(
-            lambda row: "⏱️ Time Attack" if pd.notna(row.get('is_time_attack')) and row['is_time_attack'] == 1
-            else ("🏆 Official" if pd.notna(row['competition_id']) else "❌ Unofficial"),
-            axis=1
+        display_df['Status'] = np.select(
+            [display_df['is_time_attack'] == 1, display_df['competition_id'].notna()],
+            ["⏱️ Time Attack", "🏆 Official"],
+            default="❌ Unofficial"
         )
         
         # Data formattata con ora
-        display_df['Date & Time'] = display_df['session_date'].apply(
-            lambda x: self.format_session_datetime(x) if pd.notna(x) else "N/A"
-        )
+        display_df['Date & Time'] = display_df['session_datetime_str']
         
         # Fastest driver info formattata
         display_df['Fastest'] = display_df['fastest_name'].fillna("N/A")
 
         # Best time formattata
-        display_df['Best Time'] = display_df['fastest_time'].apply(
-            lambda x: self.format_lap_time(x) if pd.notna(x) else "N/A"
-        )
+        display_df['Best Time'] = self.format_lap_time_series(display_df['fastest_time'])
         
         # Seleziona colonne finali per display
         columns_to_show = ['Session', 'Type', 'Status', 'track_name', 'Date & Time', 'total_drivers', 'Fastest', 'Best Time']
@@ -2298,7 +2678,7 @@ class ACCWebDashboard:
             'Best Time': 'Best Time'
         }
         
-        final_display = display_df[columns_to_show].copy()
+        final_display = display_df[columns_to_show]
         final_display.columns = [column_names[col] for col in columns_to_show]
         
         # Mostra tabella completa
@@ -2311,8 +2691,9 @@ class ACCWebDashboard:
         
         # Info riassuntive
         total_sessions = len(final_display)
-        time_attack_count = len(display_df[(pd.notna(display_df.get('is_time_attack'))) & (display_df['is_time_attack'] == 1)])
-        official_count = len(display_df[pd.notna(display_df['competition_id']) & ((pd.isna(display_df.get('is_time_attack'))) | (display_df['is_time_attack'] == 0))])
+        is_time_attack = display_df['is_time_attack']
+        time_attack_count = int((is_time_attack == 1).sum())
+        official_count = int((display_df['competition_id'].notna() & (is_time_attack.isna() | (is_time_attack == 0))).sum())
         unofficial_count = total_sessions - official_count - time_attack_count
 
         col1, col2, col3, col4 = st.columns(4)
@@ -2336,11 +2717,7 @@ class ACCWebDashboard:
 
             # Formatta data ultima sessione
             if sessions_stats.get('last_session_date'):
-                try:
-                    last_date = datetime.fromisoformat(sessions_stats['last_session_date'].replace('Z', '+00:00'))
-                    last_date_str = last_date.strftime('%d/%m/%Y %H:%M')
-                except:
-                    last_date_str = sessions_stats['last_session_date'][:16] if sessions_stats['last_session_date'] else "N/A"
+                last_date_str = self.format_session_datetime(sessions_stats['last_session_date'])
             else:
                 last_date_str = "N/A"
 
@@ -2357,58 +2734,62 @@ class ACCWebDashboard:
             - 📅 **Last Session Date:** {last_date_str}
             """)
 
+    def downsample_lttb(self, y_values, n_out: int = 500) -> np.ndarray:
+        """Indici dei punti da mantenere (Largest-Triangle-Three-Buckets, x = posizione)"""
+        y = np.asarray(y_values, dtype=float)
+        n = len(y)
+        if n <= n_out or n_out < 3:
+            return np.arange(n)
+
+        x = np.arange(n, dtype=float)
+        # n_out - 2 bucket interni, primo e ultimo punto sempre mantenuti
+        edges = np.linspace(1, n - 1, n_out - 1).astype(np.int64)
+        indices = np.empty(n_out, dtype=np.int64)
+        indices[0], indices[-1] = 0, n - 1
+
+        prev = 0
+        for i in range(n_out - 2):
+            start, end = edges[i], edges[i + 1]
+
+            # Punto medio del bucket successivo (l'ultimo punto per l'ultimo bucket)
+            if i + 2 < len(edges):
+                next_start, next_end = edges[i + 1], edges[i + 2]
+                avg_x = x[next_start:next_end].mean()
+                avg_y = y[next_start:next_end].mean()
+            else:
+                avg_x, avg_y = x[-1], y[-1]
+
+            # Punto del bucket che forma il triangolo di area massima
+            area = np.abs(
+                (x[prev] - avg_x) * (y[start:end] - y[prev])
+                - (x[prev] - x[start:end]) * (avg_y - y[prev])
+            )
+            prev = start + int(np.argmax(area))
+            indices[i + 1] = prev
+
+        return indices
+
     def show_daily_participation_chart(self, date_from: date, date_to: date):
         """Mostra grafico andamento partecipazione giornaliera nel periodo selezionato"""
+        import plotly.graph_objects as go
+
         st.subheader("📈 Daily Participation Trend")
 
         try:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-
             # Converti date per query SQL
             date_from_str = date_from.strftime('%Y-%m-%d')
             date_to_str = (date_to + timedelta(days=1)).strftime('%Y-%m-%d')
 
-            # Query per contare partecipanti unici per giorno (separati per registrati e guest) + numero sessioni
-            cursor.execute("""
-                SELECT
-                    DATE(s.session_date) as session_day,
-                    COUNT(DISTINCT CASE WHEN d.trust_level > 0 THEN sr.driver_id END) as registered_participants,
-                    COUNT(DISTINCT CASE WHEN d.trust_level = 0 THEN sr.driver_id END) as guest_participants,
-                    COUNT(DISTINCT s.session_id) as total_sessions
-                FROM sessions s
-                JOIN session_results sr ON s.session_id = sr.session_id
-                JOIN drivers d ON sr.driver_id = d.driver_id
-                WHERE DATE(s.session_date) >= ? AND DATE(s.session_date) < ?
-                GROUP BY DATE(s.session_date)
-                ORDER BY session_day ASC
-            """, (date_from_str, date_to_str))
-
-            participation_data = cursor.fetchall()
-            conn.close()
-
-            if participation_data:
-                # Converti i dati per il grafico
-                dates = []
-                registered = []
-                guests = []
-                sessions = []
-
-                for session_day, reg_count, guest_count, session_count in participation_data:
-                    # Formatta data per visualizzazione
-                    try:
-                        date_obj = datetime.strptime(session_day, "%Y-%m-%d")
-                        formatted_date = date_obj.strftime("%d/%m/%Y")
-                        dates.append(formatted_date)
-                        registered.append(reg_count if reg_count else 0)
-                        guests.append(guest_count if guest_count else 0)
-                        sessions.append(session_count if session_count else 0)
-                    except:
-                        # Se la conversione fallisce, usa la stringa originale
-                        dates.append(session_day)
-                        registered.append(reg_count if reg_count else 0)
-                        guests.append(guest_count if guest_count else 0)
-                        sessions.append(session_count if session_count else 0)
+            # Serie giornaliere complete (cache per periodo): servono anche per le statistiche
+            dates, registered_arr, guests_arr, sessions_arr = load_daily_participation(self._conn, self.db_path, self.get_database_mtime(), date_from_str, date_to_str)
+
+            if len(dates):
+                registered, guests, sessions = registered_arr, guests_arr, sessions_arr
+
+                # Periodi molto lunghi: riduci i punti (LTTB sul totale partecipanti) per non appesantire il browser
+                if len(dates) > 1000:
+                    keep = self.downsample_lttb(registered_arr + guests_arr)
+                    dates, registered, guests, sessions = dates[keep], registered_arr[keep], guests_arr[keep], sessions_arr[keep]
 
                 # Crea il grafico con Plotly
                 fig = go.Figure()
@@ -2488,26 +2869,20 @@ class ACCWebDashboard:
 
                 st.plotly_chart(fig, use_container_width=True)
 
-                # Statistiche aggiuntive
+                # Statistiche aggiuntive (riduzioni NumPy sulle serie complete, non vuote)
                 col1, col2, col3, col4, col5, col6 = st.columns(6)
                 with col1:
-                    avg_registered = sum(registered) / len(registered) if registered else 0
-                    st.metric("Avg Registered", f"{avg_registered:.1f}")
+                    st.metric("Avg Registered", f"{registered_arr.mean():.1f}")
                 with col2:
-                    max_registered = max(registered) if registered else 0
-                    st.metric("Peak Registered", f"{max_registered}")
+                    st.metric("Peak Registered", f"{registered_arr.max()}")
                 with col3:
-                    avg_guests = sum(guests) / len(guests) if guests else 0
-                    st.metric("Avg Guests", f"{avg_guests:.1f}")
+                    st.metric("Avg Guests", f"{guests_arr.mean():.1f}")
                 with col4:
-                    max_guests = max(guests) if guests else 0
-                    st.metric("Peak Guests", f"{max_guests}")
+                    st.metric("Peak Guests", f"{guests_arr.max()}")
                 with col5:
-                    avg_sessions = sum(sessions) / len(sessions) if sessions else 0
-                    st.metric("Avg Sessions/Day", f"{avg_sessions:.1f}")
+                    st.metric("Avg Sessions/Day", f"{sessions_arr.mean():.1f}")
                 with col6:
-                    total_sessions = sum(sessions) if sessions else 0
-                    st.metric("Total Sessions", f"{total_sessions}")
+                    st.metric("Total Sessions", f"{sessions_arr.sum()}")
 
             else:
                 st.info("ℹ️ No participation data available for the selected period")
@@ -2528,11 +2903,7 @@ class ACCWebDashboard:
         session_type, track_name, session_date, total_drivers, competition_id, competition_name, round_number = session_info
         
         # Formatta data
-        try:
-            date_obj = datetime.fromisoformat(session_date.replace('Z', '+00:00'))
-            date_str = date_obj.strftime('%d/%m/%Y %H:%M')
-        except:
-            date_str = session_date[:16] if session_date else 'N/A'
+        date_str = self.format_session_datetime(session_date)
         
         # Titolo con info competizione se disponibile
         if competition_name:
@@ -2555,37 +2926,15 @@ class ACCWebDashboard:
         session_results_df = self.get_session_results(session_id)
         
         if not session_results_df.empty:
-            # Formatta risultati sessione (stesso codice del 4Fun)
-            session_display = session_results_df.copy()
-            
-            # Aggiungi medaglie per primi 3
-            session_display['Pos'] = session_display['position'].apply(
-                lambda x: "🥇" if x == 1 else "🥈" if x == 2 else "🥉" if x == 3 else str(int(x)) if pd.notna(x) else "NC"
-            )
-            
-            # Formatta tempo giro
-            session_display['Best Lap'] = session_display['best_lap'].apply(
-                lambda x: self.format_lap_time(x) if pd.notna(x) else "N/A"
-            )
-            
-            # Formatta tempo totale
-            session_display['Total Time'] = session_display['total_time'].apply(
-                lambda x: self.format_lap_time(x) if pd.notna(x) else "N/A"
-            )
-            
-            # Seleziona colonne da mostrare
-            columns_to_show = ['Pos', 'race_number', 'driver', 'lap_count', 'Best Lap', 'Total Time']
-            column_names = {
-                'Pos': 'Pos',
-                'race_number': 'Num#',
-                'driver': 'Driver',
-                'lap_count': 'Laps',
-                'Best Lap': 'Best Lap',
-                'Total Time': 'Total Time'
-            }
-            
-            session_display = session_display[columns_to_show]
-            session_display.columns = [column_names[col] for col in columns_to_show]
+            # Tabella costruita direttamente dalle colonne formattate (medaglie per i primi 3)
+            session_display = self.to_arrow_strings(pd.DataFrame({
+                'Pos': self.format_position_series(session_results_df['position']),
+                'Num#': session_results_df['race_number'],
+                'Driver': session_results_df['driver'],
+                'Laps': session_results_df['lap_count'],
+                'Best Lap': self.format_lap_time_series(session_results_df['best_lap']),
+                'Total Time': self.format_lap_time_series(session_results_df['total_time'])
+            }))
             
             # Mostra tutti i risultati
             st.dataframe(
@@ -2606,6 +2955,8 @@ class ACCWebDashboard:
         if results_df.empty or len(results_df) < 4:
             return
         
+        import plotly.graph_objects as go
+        
         st.markdown("---")
         st.subheader("📊 Session Analysis")
         
@@ -2639,34 +2990,35 @@ class ACCWebDashboard:
                 valid_times['gap_seconds'] = (valid_times['best_lap'] - winner_time) / 1000
                 
                 # Formatta per display
-                valid_times['gap_display'] = valid_times['gap_seconds'].apply(
-                    lambda x: f"+{x:.3f}s" if x > 0 else "Leader"
+                gap_seconds = valid_times['gap_seconds'].to_numpy(dtype=float)
+                valid_times['gap_display'] = np.where(
+                    gap_seconds > 0, np.char.mod('+%.3fs', gap_seconds), "Leader"
                 )
                 
                 # Converti tempi in formato MM:SS.sss per tooltip
-                valid_times['lap_time_formatted'] = valid_times['best_lap'].apply(
-                    lambda x: self.format_lap_time(x)
-                )
+                valid_times['lap_time_formatted'] = self.format_lap_time_series(valid_times['best_lap'])
                 
                 # Crea grafico a barre orizzontale (più leggibile)
-                fig_gap = px.bar(
-                    valid_times,
-                    x='gap_seconds',
-                    y='driver',
+                # Solo le colonne usate dal tooltip vengono serializzate nel grafico
+                fig_gap = go.Figure(go.Bar(
+                    x=valid_times['gap_seconds'],
+                    y=valid_times['driver'],
                     orientation='h',
-                    title=f"Gap from Winner - Best Lap Times (Top 10)",
-                    color='gap_seconds',
-                    color_continuous_scale='RdYlGn_r',  # Rosso = più lento, Verde = più veloce
-                    hover_data={
-                        'gap_seconds': False,  # Nascondi gap_seconds nel tooltip
-                        'gap_display': True,   # Mostra gap formattato
-                        'lap_time_formatted': True,  # Mostra tempo giro
-                        'position': True       # Mostra posizione
-                    }
-                )
+                    marker=dict(
+                        color=valid_times['gap_seconds'],
+                        colorscale='RdYlGn_r',  # Rosso = più lento, Verde = più veloce
+                        colorbar=dict(title='Gap (s)')
+                    ),
+                    customdata=valid_times[['gap_display', 'lap_time_formatted', 'position']].to_numpy(),
+                    hovertemplate=(
+                        '<b>%{y}</b><br>Gap: %{customdata[0]}<br>'
+                        'Best Lap: %{customdata[1]}<br>Position: %{customdata[2]}<extra></extra>'
+                    )
+                ))
                 
                 # Personalizza grafico
                 fig_gap.update_layout(
+                    title="Gap from Winner - Best Lap Times (Top 10)",
                     height=400, 
                     showlegend=False,
                     xaxis_title="Gap from Winner (seconds)",
@@ -2705,16 +3057,24 @@ class ACCWebDashboard:
             if not laps_data.empty:
                 laps_data = laps_data.sort_values('lap_count', ascending=True)
                 
-                fig_laps = px.bar(
-                    laps_data,
-                    x='lap_count',
-                    y='driver',
+                fig_laps = go.Figure(go.Bar(
+                    x=laps_data['lap_count'],
+                    y=laps_data['driver'],
                     orientation='h',
+                    marker=dict(
+                        color=laps_data['lap_count'],
+                        colorscale='greens',
+                        colorbar=dict(title='Laps')
+                    ),
+                    hovertemplate='<b>%{y}</b><br>Laps: %{x}<extra></extra>'
+                ))
+                fig_laps.update_layout(
                     title="Laps Completed by Driver",
-                    color='lap_count',
-                    color_continuous_scale='greens'
+                    xaxis_title="lap_count",
+                    yaxis_title="driver",
+                    height=400,
+                    showlegend=False
                 )
-                fig_laps.update_layout(height=400, showlegend=False)
                 st.plotly_chart(fig_laps, use_container_width=True)
             else:
                 st.info("No lap count data for chart")
@@ -2723,20 +3083,25 @@ class ACCWebDashboard:
         if len(valid_times) > 5:
             st.subheader("📈 Lap Times Distribution")
             
-            # Istogramma dei tempi giro
-            fig_hist = px.histogram(
-                valid_times,
-                x='gap_seconds',
-                nbins=min(10, len(valid_times)),
-                title="Distribution of Gap Times",
-                labels={'gap_seconds': 'Gap from Winner (seconds)', 'count': 'Number of Drivers'},
-                color_discrete_sequence=['lightblue']
+            # Istogramma dei tempi giro (bin calcolati lato server, al browser solo i conteggi)
+            counts, edges = np.histogram(
+                valid_times['gap_seconds'].to_numpy(dtype=float),
+                bins=min(10, len(valid_times))
             )
+            fig_hist = go.Figure(go.Bar(
+                x=0.5 * (edges[:-1] + edges[1:]),
+                y=counts,
+                width=np.diff(edges) * 0.9,
+                marker_color='lightblue',
+                hovertemplate='Gap: %{x:.3f}s<br>Drivers: %{y}<extra></extra>'
+            ))
             
             fig_hist.update_layout(
+                title="Distribution of Gap Times",
+                xaxis_title="Gap from Winner (seconds)",
+                yaxis_title="Number of Drivers",
                 height=300,
-                showlegend=False,
-                bargap=0.1
+                showlegend=False
             )
             
             st.plotly_chart(fig_hist, use_container_width=True)
@@ -2744,28 +3109,19 @@ class ACCWebDashboard:
 
     # ==================== BEST LAPS ====================
 
-    def format_time_duration(self, milliseconds: int) -> str:
-        """Formatta durata in millisecondi per gap"""
-        if not milliseconds or milliseconds <= 0:
-            return "0.000"
-        
-        if milliseconds < 1000:
-            return f"0.{milliseconds:03d}"
-        else:
-            seconds = milliseconds / 1000
-            return f"{seconds:.3f}"
-    
+    def format_competition_names(self, df: pd.DataFrame) -> pd.Series:
+        """Concatena competizione e campionato (vettoriale): "competizione - campionato" """
+        competition = df['competition_name'].astype('string')
+        championship = df['championship_name'].astype('string')
+
+        # NA se manca uno dei due, poi ripiega sul nome disponibile
+        combined = competition + ' - ' + championship
+        return combined.fillna(competition).fillna(championship).fillna("N/A")
+
     def get_tracks_list(self) -> List[str]:
         """Ottiene lista piste disponibili nel database"""
         try:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-            
-            cursor.execute('SELECT DISTINCT track_name FROM sessions ORDER BY track_name')
-            tracks = [row[0] for row in cursor.fetchall()]
-            
-            conn.close()
-            return tracks
+            return load_tracks_list(self._conn, self.db_path, self.get_database_mtime())
             
         except Exception as e:
             st.error(f"❌ Errore nel recupero piste: {e}")
@@ -2775,40 +3131,44 @@ class ACCWebDashboard:
         """Ottiene riepilogo record per tutte le piste (solo competizioni ufficiali e piloti TFL)"""
 
         query = '''
-            WITH track_records AS (
+            SELECT
+                track_name,
+                best_lap,
+                driver_name,
+                session_date,
+                session_type,
+                is_time_attack,
+                competition_id,
+                competition_name,
+                championship_name
+            FROM (
                 SELECT
                     s.track_name,
-                    MIN(l.lap_time) as best_lap
+                    l.lap_time as best_lap,
+                    d.last_name as driver_name,
+                    s.session_date,
+                    s.session_type,
+                    s.is_time_attack,
+                    s.competition_id,
+                    c.name as competition_name,
+                    ch.name as championship_name,
+                    -- Un solo detentore per pista: a parità di tempo vale il giro più vecchio
+                    ROW_NUMBER() OVER (
+                        PARTITION BY s.track_name
+                        ORDER BY l.lap_time ASC, s.session_date ASC
+                    ) as rn
                 FROM laps l
                 JOIN sessions s ON l.session_id = s.session_id
                 JOIN drivers d ON l.driver_id = d.driver_id
+                LEFT JOIN competitions c ON s.competition_id = c.competition_id
+                LEFT JOIN championships ch ON c.championship_id = ch.championship_id
                 WHERE l.is_valid_for_best = 1
                   AND l.lap_time > 0
                   AND s.competition_id IS NOT NULL
                   AND d.trust_level > 0
-                GROUP BY s.track_name
             )
-            SELECT
-                tr.track_name,
-                tr.best_lap,
-                d.last_name as driver_name,
-                s.session_date,
-                s.session_type,
-                s.is_time_attack,
-                s.competition_id,
-                c.name as competition_name,
-                ch.name as championship_name
-            FROM track_records tr
-            JOIN laps l ON tr.best_lap = l.lap_time
-            JOIN sessions s ON l.session_id = s.session_id AND s.track_name = tr.track_name
-            JOIN drivers d ON l.driver_id = d.driver_id
-            LEFT JOIN competitions c ON s.competition_id = c.competition_id
-            LEFT JOIN championships ch ON c.championship_id = ch.championship_id
-            WHERE l.is_valid_for_best = 1
-              AND s.competition_id IS NOT NULL
-              AND d.trust_level > 0
-            GROUP BY tr.track_name
-            ORDER BY tr.best_lap ASC
+            WHERE rn = 1
+            ORDER BY best_lap ASC
         '''
 
         return self.safe_sql_query(query)
@@ -2816,58 +3176,15 @@ class ACCWebDashboard:
     def get_track_statistics(self, track_name: str) -> Dict:
         """Ottiene statistiche generali per la pista (solo competizioni ufficiali e piloti TFL)"""
         try:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-
-            # Statistiche generali
-            query = '''
-                SELECT
-                    COUNT(DISTINCT s.session_id) as total_sessions,
-                    COUNT(DISTINCT l.driver_id) as unique_drivers,
-                    COUNT(l.id) as total_laps,
-                    MIN(l.lap_time) as best_time,
-                    AVG(CAST(l.lap_time AS REAL)) as avg_time,
-                    MAX(s.session_date) as last_session_date,
-                    COUNT(DISTINCT CASE WHEN s.competition_id IS NOT NULL THEN s.session_id END) as official_sessions
-                FROM sessions s
-                LEFT JOIN laps l ON s.session_id = l.session_id
-                LEFT JOIN drivers d ON l.driver_id = d.driver_id
-                WHERE s.track_name = ?
-                  AND l.is_valid_for_best = 1
-                  AND l.lap_time > 0
-                  AND s.competition_id IS NOT NULL
-                  AND d.trust_level > 0
-            '''
-
-            cursor.execute(query, (track_name,))
-            result = cursor.fetchone()
+            result, _ = load_track_details(self._conn, self.db_path, self.get_database_mtime(), track_name)
 
             if result:
-                sessions, drivers, laps, best, avg, last_session, official_sessions = result
+                sessions, drivers, laps, best, avg, last_session, official_sessions, record_holder, record_date = result
 
                 # Chi detiene il record e quando
-                record_query = '''
-                    SELECT d.last_name, s.session_date
-                    FROM laps l
-                    JOIN drivers d ON l.driver_id = d.driver_id
-                    JOIN sessions s ON l.session_id = s.session_id
-                    WHERE s.track_name = ?
-                      AND l.lap_time = ?
-                      AND l.is_valid_for_best = 1
-                      AND s.competition_id IS NOT NULL
-                      AND d.trust_level > 0
-                    LIMIT 1
-                '''
-
-                cursor.execute(record_query, (track_name, best))
-                record_result = cursor.fetchone()
-                if record_result:
-                    record_holder = record_result[0]
-                    record_date = record_result[1]
-                else:
+                if record_holder is None:
                     record_holder = "N/A"
-                    record_date = None
-                
+
                 stats = {
                     'total_sessions': sessions or 0,
                     'unique_drivers': drivers or 0,
@@ -2892,7 +3209,6 @@ class ACCWebDashboard:
                     'official_sessions': 0
                 }
             
-            conn.close()
             return stats
             
         except Exception as e:
@@ -2901,48 +3217,13 @@ class ACCWebDashboard:
     
     def get_track_leaderboard(self, track_name: str) -> pd.DataFrame:
         """Ottiene classifica best laps per pista (solo competizioni ufficiali e piloti TFL)"""
-
-        query = '''
-            WITH driver_best_laps AS (
-                SELECT
-                    l.driver_id,
-                    MIN(l.lap_time) as best_lap
-                FROM laps l
-                JOIN sessions s ON l.session_id = s.session_id
-                JOIN drivers d ON l.driver_id = d.driver_id
-                WHERE s.track_name = ?
-                  AND l.is_valid_for_best = 1
-                  AND l.lap_time > 0
-                  AND s.competition_id IS NOT NULL
-                  AND d.trust_level > 0
-                GROUP BY l.driver_id
-            )
-            SELECT
-                d.last_name as driver_name,
-                d.short_name,
-                dbl.best_lap,
-                s.session_date,
-                s.session_type,
-                s.is_time_attack,
-                s.competition_id,
-                c.name as competition_name,
-                ch.name as championship_name
-            FROM driver_best_laps dbl
-            JOIN laps l ON l.driver_id = dbl.driver_id AND l.lap_time = dbl.best_lap
-            JOIN sessions s ON l.session_id = s.session_id
-            JOIN drivers d ON dbl.driver_id = d.driver_id
-            LEFT JOIN competitions c ON s.competition_id = c.competition_id
-            LEFT JOIN championships ch ON c.championship_id = ch.championship_id
-            WHERE s.track_name = ?
-              AND l.is_valid_for_best = 1
-              AND s.competition_id IS NOT NULL
-              AND d.trust_level > 0
-            GROUP BY dbl.driver_id
-            ORDER BY dbl.best_lap ASC
-            LIMIT 50
-        '''
-
-        return self.safe_sql_query(query, [track_name, track_name])
+        try:
+            # Stessa query (e stessa voce di cache) delle statistiche pista
+            _, leaderboard = load_track_details(self._conn, self.db_path, self.get_database_mtime(), track_name)
+            return leaderboard
+        except Exception as e:
+            st.error(f"❌ Errore nella query: {e}")
+            return pd.DataFrame()
     
     def show_best_laps_report(self):
         """Mostra il report Best Laps per pista"""
@@ -3012,40 +3293,28 @@ class ACCWebDashboard:
         summary_display = summary_df.copy()
         
         # Formatta tempo record
-        summary_display['Record'] = summary_display['best_lap'].apply(
-            lambda x: self.format_lap_time(x) if pd.notna(x) else "N/A"
-        )
+        summary_display['Record'] = self.format_lap_time_series(summary_display['best_lap'])
         
         # Ordina per data originale (ISO format) decrescente prima di formattare
         summary_display = summary_display.sort_values('session_date', ascending=False)
         
         # Formatta data
-        summary_display['Data'] = summary_display['session_date'].apply(
-            lambda x: self.format_session_date(x) if pd.notna(x) else "N/A"
-        )
+        summary_display['Data'] = summary_display['session_date'].map(
+            self.format_session_date, na_action='ignore'
+        ).fillna("N/A")
         
         # Nome pista senza decorazioni
         summary_display['Pista'] = summary_display['track_name']
 
         # Formatta colonna Session Type (nascondi per Time Attack a causa di bug ACC)
-        summary_display['Session'] = summary_display.apply(
-            lambda row: "-" if row['is_time_attack'] == 1 else row['session_type'],
-            axis=1
-        )
+        is_time_attack = summary_display['is_time_attack'] == 1
+        summary_display['Session'] = np.where(is_time_attack, "-", summary_display['session_type'])
 
         # Formatta colonna Race Type (Official Race o Time Attack)
-        summary_display['Type'] = summary_display['is_time_attack'].apply(
-            lambda x: "⏱️ Time Attack" if x == 1 else "🏁 Official Race"
-        )
+        summary_display['Type'] = np.where(is_time_attack, "⏱️ Time Attack", "🏁 Official Race")
 
         # Formatta colonna Competition: concatena competition_name e championship_name
-        summary_display['Competition'] = summary_display.apply(
-            lambda row: f"{row['competition_name']} - {row['championship_name']}"
-            if pd.notna(row.get('competition_name')) and pd.notna(row.get('championship_name'))
-            else (row.get('competition_name') if pd.notna(row.get('competition_name'))
-                  else (row.get('championship_name') if pd.notna(row.get('championship_name')) else "N/A")),
-            axis=1
-        )
+        summary_display['Competition'] = self.format_competition_names(summary_display)
 
         # Seleziona colonne finali (Type prima di Session)
         columns_to_show = ['Pista', 'Record', 'driver_name', 'Type', 'Session', 'Data', 'Competition']
@@ -3059,7 +3328,7 @@ class ACCWebDashboard:
             'Competition': 'Competition'
         }
 
-        final_display = summary_display[columns_to_show].copy()
+        final_display = summary_display[columns_to_show]
         final_display.columns = [column_names[col] for col in columns_to_show]
 
         # Configura larghezza colonne (in pixel)
@@ -3085,10 +3354,10 @@ class ACCWebDashboard:
         total_tracks = len(summary_display)
         
         # Trova pilota/i con più record
-        driver_records = summary_display['driver_name'].value_counts()
-        if not driver_records.empty:
-            max_records = driver_records.iloc[0]
-            top_holders = driver_records[driver_records == max_records].index.tolist()
+        driver_records = Counter(summary_display['driver_name'].dropna().tolist())
+        if driver_records:
+            max_records = driver_records.most_common(1)[0][1]
+            top_holders = [name for name, count in driver_records.items() if count == max_records]
             
             if len(top_holders) == 1:
                 # Un solo pilota con il massimo
@@ -3147,49 +3416,35 @@ class ACCWebDashboard:
             leaderboard_display = leaderboard_df.copy()
 
             # Aggiungi medaglie per i primi 3
-            leaderboard_display['Posizione'] = leaderboard_display.reset_index().index + 1
-            leaderboard_display['Pos'] = leaderboard_display['Posizione'].apply(
-                lambda x: "🥇" if x == 1 else "🥈" if x == 2 else "🥉" if x == 3 else str(x)
-            )
+            positions = np.arange(1, len(leaderboard_display) + 1).astype(str).astype(object)
+            medals = list(POSITION_MEDALS.values())[:len(positions)]
+            positions[:len(medals)] = medals
+            leaderboard_display['Pos'] = positions
 
             # Formatta tempi
-            leaderboard_display['Best Time'] = leaderboard_display['best_lap'].apply(
-                lambda x: self.format_lap_time(x) if pd.notna(x) else "N/A"
-            )
+            leaderboard_display['Best Time'] = self.format_lap_time_series(leaderboard_display['best_lap'])
 
-            # Calcola gap dal leader
-            if len(leaderboard_display) > 1:
-                best_time = leaderboard_display.iloc[0]['best_lap']
-                leaderboard_display['Gap'] = leaderboard_display['best_lap'].apply(
-                    lambda x: f"+{self.format_time_duration(x - best_time)}" if x != best_time else "-"
-                )
-            else:
-                leaderboard_display['Gap'] = "-"
+            # Calcola gap dal leader (la classifica è già ordinata per best_lap: il leader ha gap 0 -> "-")
+            best_laps = leaderboard_display['best_lap'].to_numpy(dtype=np.int64)
+            gap_ms = best_laps - best_laps[0]
+            leaderboard_display['Gap'] = np.where(
+                gap_ms > 0, np.char.mod('+%.3f', gap_ms / 1000), "-"
+            )
 
             # Formatta data
-            leaderboard_display['Record Date'] = leaderboard_display['session_date'].apply(
-                lambda x: self.format_session_date(x) if pd.notna(x) else "N/A"
-            )
+            leaderboard_display['Record Date'] = leaderboard_display['session_date'].map(
+                self.format_session_date, na_action='ignore'
+            ).fillna("N/A")
 
             # Formatta colonna Session Type (nascondi per Time Attack a causa di bug ACC)
-            leaderboard_display['Session'] = leaderboard_display.apply(
-                lambda row: "-" if row['is_time_attack'] == 1 else row['session_type'],
-                axis=1
-            )
+            is_time_attack = leaderboard_display['is_time_attack'] == 1
+            leaderboard_display['Session'] = np.where(is_time_attack, "-", leaderboard_display['session_type'])
 
             # Formatta colonna Race Type (Official Race o Time Attack)
-            leaderboard_display['Type'] = leaderboard_display['is_time_attack'].apply(
-                lambda x: "⏱️ Time Attack" if x == 1 else "🏁 Official Race"
-            )
+            leaderboard_display['Type'] = np.where(is_time_attack, "⏱️ Time Attack", "🏁 Official Race")
 
             # Formatta colonna Competition: concatena competition_name e championship_name
-            leaderboard_display['Competition'] = leaderboard_display.apply(
-                lambda row: f"{row['competition_name']} - {row['championship_name']}"
-                if pd.notna(row.get('competition_name')) and pd.notna(row.get('championship_name'))
-                else (row.get('competition_name') if pd.notna(row.get('competition_name'))
-                      else (row.get('championship_name') if pd.notna(row.get('championship_name')) else "N/A")),
-                axis=1
-            )
+            leaderboard_display['Competition'] = self.format_competition_names(leaderboard_display)
 
             # Seleziona colonne finali (Type prima di Session)
             columns_to_show = ['Pos', 'driver_name', 'Best Time', 'Gap', 'Type', 'Session', 'Record Date', 'Competition']
@@ -3204,7 +3459,7 @@ class ACCWebDashboard:
                 'Competition': 'Competition'
             }
 
-            final_display = leaderboard_display[columns_to_show].copy()
+            final_display = leaderboard_display[columns_to_show]
             final_display.columns = [column_names[col] for col in columns_to_show]
 
             # Configura larghezza colonne (in pixel)
@@ -3243,25 +3498,11 @@ class ACCWebDashboard:
 
         # Record date
         record_date = track_stats.get('record_date')
-        if record_date:
-            try:
-                record_date_obj = datetime.fromisoformat(record_date.replace('Z', '+00:00'))
-                record_date_formatted = record_date_obj.strftime('%d/%m/%Y')
-            except:
-                record_date_formatted = "N/A"
-        else:
-            record_date_formatted = "N/A"
+        record_date_formatted = self.format_session_date(record_date) if record_date else "N/A"
 
         # Last session date
         last_session = track_stats.get('last_session_date')
-        if last_session:
-            try:
-                last_date = datetime.fromisoformat(last_session.replace('Z', '+00:00'))
-                last_text = last_date.strftime('%d/%m/%Y')
-            except:
-                last_text = "N/A"
-        else:
-            last_text = "N/A"
+        last_text = self.format_session_date(last_session) if last_session else "N/A"
 
         # Elenco compatto statistiche
         st.markdown(f"""
@@ -3298,43 +3539,10 @@ class ACCWebDashboard:
 
         return " - ".join(parts) if parts else "N/A"
 
-    def format_session_type_with_official_indicator(self, session_type: str, competition_id) -> str:
-        """Formatta tipo sessione con indicatore per sessioni ufficiali"""
-        import pandas as pd
-        formatted_type = self.format_session_type(session_type)
-
-        # Aggiunge pallino verde per sessioni ufficiali, grigio per non ufficiali
-        if competition_id is not None and not pd.isna(competition_id):
-            return f"🟢 {formatted_type}"
-        else:
-            return f"⚪ {formatted_type}"
-
     def get_drivers_list(self) -> List[Dict]:
         """Ottiene lista piloti disponibili nel database ordinata alfabeticamente"""
         try:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-            
-            query = '''
-                SELECT DISTINCT d.driver_id, d.last_name, d.short_name
-                FROM drivers d
-                WHERE d.trust_level > 0
-                AND EXISTS (
-                    SELECT 1 FROM laps l WHERE l.driver_id = d.driver_id
-                )
-                ORDER BY LOWER(d.last_name)
-            '''
-            cursor.execute(query)
-            drivers = []
-            for row in cursor.fetchall():
-                drivers.append({
-                    'driver_id': row[0],
-                    'last_name': row[1],
-                    'short_name': row[2]
-                })
-            
-            conn.close()
-            return drivers
+            return load_drivers_list(self._conn, self.db_path, self.get_database_mtime())
             
         except Exception as e:
             st.error(f"❌ Errore nel recupero piloti: {e}")
@@ -3342,119 +3550,29 @@ class ACCWebDashboard:
     
     def get_all_drivers_summary(self) -> pd.DataFrame:
         """Ottiene riepilogo generale di tutti i piloti"""
-        
-        query = '''
-            SELECT 
-                d.driver_id,
-                d.last_name as driver_name,
-                d.preferred_race_number as number,
-                COALESCE(champ.championships, 0) as championships,
-                COALESCE(champ.wins, 0) as wins,
-                COALESCE(champ.poles, 0) as poles,
-                COALESCE(champ.podiums, 0) as podiums,
-                COALESCE(records.records, 0) as records
-            FROM drivers d
-            LEFT JOIN (
-                -- Statistiche da championship_standings
-                SELECT 
-                    driver_id,
-                    SUM(CASE WHEN position = 1 THEN 1 ELSE 0 END) as championships,
-                    SUM(wins) as wins,
-                    SUM(poles) as poles,
-                    SUM(podiums) as podiums
-                FROM championship_standings 
-                GROUP BY driver_id
-            ) champ ON d.driver_id = champ.driver_id
-            LEFT JOIN (
-                -- Conteggio record ufficiali detenuti
-                SELECT 
-                    l.driver_id,
-                    COUNT(DISTINCT s.track_name) as records
-                FROM laps l
-                JOIN sessions s ON l.session_id = s.session_id
-                WHERE l.is_valid_for_best = 1 AND l.lap_time > 0
-                AND l.lap_time = (
-                    SELECT MIN(l2.lap_time) 
-                    FROM laps l2 
-                    JOIN sessions s2 ON l2.session_id = s2.session_id 
-                    WHERE s2.track_name = s.track_name 
-                    AND l2.is_valid_for_best = 1 
-                    AND l2.lap_time > 0
-                )
-                GROUP BY l.driver_id
-            ) records ON d.driver_id = records.driver_id
-            WHERE d.trust_level > 0
-            AND EXISTS (
-                SELECT 1 FROM laps l WHERE l.driver_id = d.driver_id
-            )
-            ORDER BY d.last_name
-        '''
-        
-        return self.safe_sql_query(query)
+        try:
+            return load_all_drivers_summary(self._conn, self.db_path, self.get_database_mtime())
+        except Exception as e:
+            st.error(f"❌ Errore nella query: {e}")
+            return pd.DataFrame()
     
     def get_driver_statistics(self, driver_id: int) -> Dict:
         """Ottiene statistiche complete per un pilota"""
         try:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-            
-            # Query per statistiche base
-            stats_query = '''
-                SELECT 
-                    COUNT(DISTINCT l.session_id) as total_sessions,
-                    COUNT(DISTINCT CASE WHEN s.competition_id IS NOT NULL THEN l.session_id END) as official_sessions,
-                    COUNT(DISTINCT s.track_name) as num_tracks,
-                    d.trust_level
-                FROM laps l
-                JOIN sessions s ON l.session_id = s.session_id
-                JOIN drivers d ON l.driver_id = d.driver_id
-                WHERE l.driver_id = ?
-            '''
-            
-            cursor.execute(stats_query, [driver_id])
-            row = cursor.fetchone()
-            
-            stats = {
-                'total_sessions': row[0] if row[0] else 0,
-                'official_sessions': row[1] if row[1] else 0,
-                'num_tracks': row[2] if row[2] else 0,
-                'trust_level': row[3] if row[3] is not None else 'N/A'
-            }
-            
-            # Query per risultati gare (wins, poles, podiums, championships) da championship_standings
-            results_query = '''
-                SELECT 
-                    SUM(wins) as wins,
-                    SUM(poles) as poles,
-                    SUM(podiums) as podiums,
-                    SUM(CASE WHEN position = 1 THEN 1 ELSE 0 END) as championships
-                FROM championship_standings
-                WHERE driver_id = ?
-            '''
+            stats_map = load_driver_statistics_map(self._conn, self.db_path, self.get_database_mtime())
             
-            cursor.execute(results_query, [driver_id])
-            row = cursor.fetchone()
-            
-            if row:
-                stats.update({
-                    'wins': row[0] if row[0] else 0,
-                    'poles': row[1] if row[1] else 0,
-                    'podiums': row[2] if row[2] else 0,
-                    'championships': row[3] if row[3] else 0
-                })
-            else:
-                stats.update({'wins': 0, 'poles': 0, 'podiums': 0, 'championships': 0})
-            
-            # Query per bad reports
-            bad_reports_query = '''
-                SELECT bad_driver_reports FROM drivers WHERE driver_id = ?
-            '''
-            cursor.execute(bad_reports_query, [driver_id])
-            bad_row = cursor.fetchone()
-            stats['bad_reports'] = bad_row[0] if bad_row and bad_row[0] else 0
-            
-            conn.close()
-            return stats
+            # Pilota senza giri registrati: nessuna statistica disponibile
+            return stats_map.get(driver_id, {
+                'total_sessions': 0,
+                'official_sessions': 0,
+                'num_tracks': 0,
+                'trust_level': 'N/A',
+                'wins': 0,
+                'poles': 0,
+                'podiums': 0,
+                'championships': 0,
+                'bad_reports': 0
+            })
             
         except Exception as e:
             st.error(f"❌ Errore nel recupero statistiche pilota: {e}")
@@ -3464,15 +3582,22 @@ class ACCWebDashboard:
         """Ottiene tutti i migliori tempi del pilota per ogni pista"""
         
         query = '''
-            WITH driver_track_bests AS (
+            WITH driver_laps AS (
+                -- Giri validi del pilota: miglior giro per pista (a parità vale il più vecchio) e totale giri
                 SELECT 
                     s.track_name,
-                    MIN(l.lap_time) as best_lap,
-                    COUNT(CASE WHEN l.is_valid_for_best = 1 THEN 1 END) as valid_laps
+                    l.lap_time,
+                    s.session_date,
+                    s.session_type,
+                    s.competition_id,
+                    ROW_NUMBER() OVER (
+                        PARTITION BY s.track_name
+                        ORDER BY l.lap_time ASC, s.session_date ASC
+                    ) as rn,
+                    COUNT(*) OVER (PARTITION BY s.track_name) as valid_laps
                 FROM laps l
                 JOIN sessions s ON l.session_id = s.session_id
                 WHERE l.driver_id = ? AND l.is_valid_for_best = 1 AND l.lap_time > 0
-                GROUP BY s.track_name
             ),
             track_records AS (
                 SELECT 
@@ -3481,26 +3606,24 @@ class ACCWebDashboard:
                 FROM laps l
                 JOIN sessions s ON l.session_id = s.session_id
                 WHERE l.is_valid_for_best = 1 AND l.lap_time > 0
+                  AND s.track_name IN (SELECT track_name FROM driver_laps)
                 GROUP BY s.track_name
             )
             SELECT 
-                dtb.track_name,
-                dtb.best_lap,
-                dtb.valid_laps,
-                s.session_date,
-                s.session_type,
-                s.competition_id,
-                CASE WHEN dtb.best_lap = tr.track_record THEN 1 ELSE 0 END as is_record
-            FROM driver_track_bests dtb
-            JOIN laps l ON dtb.best_lap = l.lap_time
-            JOIN sessions s ON l.session_id = s.session_id AND s.track_name = dtb.track_name
-            JOIN track_records tr ON dtb.track_name = tr.track_name
-            WHERE l.driver_id = ? AND l.is_valid_for_best = 1
-            GROUP BY dtb.track_name
-            ORDER BY s.session_date DESC
+                dl.track_name,
+                dl.lap_time as best_lap,
+                dl.valid_laps,
+                dl.session_date,
+                dl.session_type,
+                dl.competition_id,
+                CASE WHEN dl.lap_time = tr.track_record THEN 1 ELSE 0 END as is_record
+            FROM driver_laps dl
+            JOIN track_records tr ON dl.track_name = tr.track_name
+            WHERE dl.rn = 1
+            ORDER BY dl.session_date DESC
         '''
 
-        return self.safe_sql_query(query, [driver_id, driver_id])
+        return self.safe_sql_query(query, [driver_id], dtype_backend="pyarrow")
 
     def show_drivers_report(self):
         """Mostra il report Drivers con selezione generale o per pilota specifico"""
@@ -3513,6 +3636,9 @@ class ACCWebDashboard:
             st.warning("❌ No drivers found in database")
             return
         
+        # Lookup per nome (in caso di omonimi vale il primo in elenco, come prima)
+        drivers_by_name = {d['last_name']: d for d in reversed(drivers)}
+        
         # Selectbox pilota con riepilogo generale come prima opzione
         driver_options = ["📊 General Summary"] + [f"{driver['last_name']}" for driver in drivers]
         selected_driver = st.selectbox(
@@ -3554,7 +3680,7 @@ class ACCWebDashboard:
             
         else:
             # Trova il pilota selezionato
-            selected_driver_data = next((d for d in drivers if d['last_name'] == selected_driver), None)
+            selected_driver_data = drivers_by_name.get(selected_driver)
             if selected_driver_data:
                 # Mostra dettagli del pilota specifico
                 st.markdown("---")
@@ -3569,12 +3695,10 @@ class ACCWebDashboard:
             st.warning("⚠️ No data available for drivers summary")
             return
         
-        # Prepara display summary
-        summary_display = summary_df.copy()
+        # Prepara display summary (solo lettura, nessuna copia necessaria)
+        summary_display = summary_df
         
-        # Ordina alfabeticamente per nome (case-insensitive)
-        summary_display['driver_name_lower'] = summary_display['driver_name'].str.lower()
-        summary_display = summary_display.sort_values('driver_name_lower', ascending=True).drop('driver_name_lower', axis=1)
+        # Già in ordine alfabetico case-insensitive (ORDER BY LOWER nella query)
         
         # Seleziona colonne finali con i nomi desiderati
         columns_to_show = ['driver_name', 'number', 'championships', 'wins', 'poles', 'podiums', 'records']
@@ -3588,7 +3712,7 @@ class ACCWebDashboard:
             'records': '📊 Records'
         }
         
-        final_display = summary_display[columns_to_show].copy()
+        final_display = summary_display[columns_to_show]
         final_display.columns = [column_names[col] for col in columns_to_show]
         
         # Riempi valori mancanti con 0
@@ -3635,112 +3759,33 @@ class ACCWebDashboard:
             st.warning("⚠️ No data available for this driver")
             return
         
-        # Prima riga: Info base
-        col1, col2, col3, col4 = st.columns(4)
-        
-        with col1:
-            st.markdown(f"""
-            <div class="metric-card">
-                <p class="metric-value">{driver_data['driver_id']}</p>
-                <p class="metric-label">🆔 Driver ID</p>
-            </div>
-            """, unsafe_allow_html=True)
-        
-        with col2:
-            short_name = driver_data.get('short_name', 'N/A')
-            st.markdown(f"""
-            <div class="metric-card">
-                <p class="metric-value" style="font-size: 1.5rem;">{short_name}</p>
-                <p class="metric-label">📝 Short Name</p>
-            </div>
-            """, unsafe_allow_html=True)
-        
-        with col3:
-            total_sessions = driver_stats.get('total_sessions', 0)
-            st.markdown(f"""
-            <div class="metric-card">
-                <p class="metric-value">{total_sessions}</p>
-                <p class="metric-label">🎮 Total Sessions</p>
-            </div>
-            """, unsafe_allow_html=True)
-        
-        with col4:
-            official_sessions = driver_stats.get('official_sessions', 0)
-            st.markdown(f"""
-            <div class="metric-card">
-                <p class="metric-value">{official_sessions}</p>
-                <p class="metric-label">🏆 Official Sessions</p>
-            </div>
-            """, unsafe_allow_html=True)
-        
-        # Seconda riga: Performance
-        col1, col2, col3, col4 = st.columns(4)
-        
-        with col1:
-            championships = driver_stats.get('championships', 0)
-            st.markdown(f"""
-            <div class="metric-card">
-                <p class="metric-value">{championships}</p>
-                <p class="metric-label">🏆 Titles Won</p>
-            </div>
-            """, unsafe_allow_html=True)
-        
-        with col2:
-            wins = driver_stats.get('wins', 0)
-            st.markdown(f"""
-            <div class="metric-card">
-                <p class="metric-value">{wins}</p>
-                <p class="metric-label">🥇 Wins</p>
-            </div>
-            """, unsafe_allow_html=True)
-        
-        with col3:
-            poles = driver_stats.get('poles', 0)
-            st.markdown(f"""
-            <div class="metric-card">
-                <p class="metric-value">{poles}</p>
-                <p class="metric-label">🚩 Poles</p>
-            </div>
-            """, unsafe_allow_html=True)
-        
-        with col4:
-            podiums = driver_stats.get('podiums', 0)
-            st.markdown(f"""
-            <div class="metric-card">
-                <p class="metric-value">{podiums}</p>
-                <p class="metric-label">🏅 Podiums</p>
-            </div>
-            """, unsafe_allow_html=True)
-        
-        # Terza riga: Trust, Reports e Tracks
-        col1, col2, col3, col4 = st.columns(4)
-        
-        with col1:
-            num_tracks = driver_stats.get('num_tracks', 0)
-            st.markdown(f"""
-            <div class="metric-card">
-                <p class="metric-value">{num_tracks}</p>
-                <p class="metric-label">🏁 Tracks Driven</p>
-            </div>
-            """, unsafe_allow_html=True)
+        # Griglia metriche (4 per riga): info base, performance, trust/reports/tracks
+        # (valore, etichetta, stile extra per i valori testuali)
+        text_style = ' style="font-size: 1.5rem;"'
+        metrics = [
+            (driver_data['driver_id'], "🆔 Driver ID", ""),
+            (driver_data.get('short_name', 'N/A'), "📝 Short Name", text_style),
+            (driver_stats.get('total_sessions', 0), "🎮 Total Sessions", ""),
+            (driver_stats.get('official_sessions', 0), "🏆 Official Sessions", ""),
+            (driver_stats.get('championships', 0), "🏆 Titles Won", ""),
+            (driver_stats.get('wins', 0), "🥇 Wins", ""),
+            (driver_stats.get('poles', 0), "🚩 Poles", ""),
+            (driver_stats.get('podiums', 0), "🏅 Podiums", ""),
+            (driver_stats.get('num_tracks', 0), "🏁 Tracks Driven", ""),
+            (driver_stats.get('trust_level', 'N/A'), "🛡️ Trust Level", text_style),
+            (driver_stats.get('bad_reports', 0), "⚠️ Bad Reports", ""),
+        ]
         
-        with col2:
-            trust_level = driver_stats.get('trust_level', 'N/A')
-            st.markdown(f"""
-            <div class="metric-card">
-                <p class="metric-value" style="font-size: 1.5rem;">{trust_level}</p>
-                <p class="metric-label">🛡️ Trust Level</p>
-            </div>
-            """, unsafe_allow_html=True)
+        cards = "".join(
+            f'<div class="metric-card">'
+            f'<p class="metric-value"{style}>{value}</p>'
+            f'<p class="metric-label">{label}</p>'
+            f'</div>'
+            for value, label, style in metrics
+        )
         
-        with col3:
-            bad_reports = driver_stats.get('bad_reports', 0)
-            st.markdown(f"""
-            <div class="metric-card">
-                <p class="metric-value">{bad_reports}</p>
-                <p class="metric-label">⚠️ Bad Reports</p>
-            </div>
-            """, unsafe_allow_html=True)
+        # Un solo elemento markdown invece di uno per card
+        st.markdown(f'<div class="metric-grid">{cards}</div>', unsafe_allow_html=True)
         
         # Elenco migliori tempi per pista
         st.markdown("---")
@@ -3761,29 +3806,28 @@ class ACCWebDashboard:
             st.warning("⚠️ No best times data available for this driver")
             return
         
-        # Prepara display data
-        display_df = best_times_df.copy()
+        # Prepara display data (DataFrame appena letto dalla query, non condiviso)
+        display_df = best_times_df
         
         # Formatta tempo con eventuale indicatore record
-        display_df['Best Time'] = display_df.apply(
-            lambda row: f"{self.format_lap_time(row['best_lap'])} 🏆" if pd.notna(row['best_lap']) and row.get('is_record', False) else (self.format_lap_time(row['best_lap']) if pd.notna(row['best_lap']) else "N/A"),
-            axis=1
-        )
+        is_record = display_df['best_lap'].notna() & (display_df['is_record'] == 1)
+        display_df['Best Time'] = self.format_lap_time_series(display_df['best_lap']) + np.where(is_record, " 🏆", "")
         
-        # Ordina per data del miglior tempo (decrescente)
-        display_df = display_df.sort_values('session_date', ascending=False)
+        # Righe già ordinate per data del miglior tempo (decrescente) dalla query
         
-        # Formatta data
-        display_df['Date'] = display_df['session_date'].apply(
-            lambda x: self.format_session_date(x) if pd.notna(x) else "N/A"
-        )
+        # Formatta data (formatter in cache, NaN esclusi dalla chiamata)
+        display_df['Date'] = display_df['session_date'].map(
+            self.format_session_date, na_action='ignore'
+        ).fillna("N/A")
         
         # Formatta tipo sessione con indicatore ufficiale
-        display_df['Session'] = display_df.apply(
-            lambda row: self.format_session_type_with_official_indicator(
-                row['session_type'], row['competition_id']
-            ) if pd.notna(row['session_type']) else "N/A", axis=1
+        # 🟢 ufficiale / ⚪ non ufficiale
+        session_types = self.format_session_type_series(display_df['session_type'])
+        official_prefix = pd.Series(
+            np.where(display_df['competition_id'].notna(), "🟢 ", "⚪ "),
+            index=display_df.index
         )
+        display_df['Session'] = (official_prefix + session_types).where(display_df['session_type'].notna(), "N/A")
         
         # Nome pista senza indicatore record (ora è nel tempo)
         display_df['Track'] = display_df['track_name']
@@ -3798,7 +3842,7 @@ class ACCWebDashboard:
             'Date': 'Date'
         }
         
-        final_display = display_df[columns_to_show].copy()
+        final_display = display_df[columns_to_show]
         final_display.columns = [column_names[col] for col in columns_to_show]
         
         st.dataframe(
@@ -3810,7 +3854,7 @@ class ACCWebDashboard:
         
         # Info aggiuntive
         total_tracks = len(display_df)
-        records_held = len(display_df[display_df.get('is_record', False) == True])
+        records_held = int((display_df['is_record'] == 1).sum())
         
         col1, col2 = st.columns(2)
         
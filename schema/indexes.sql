@@ -0,0 +1,28 @@
+-- Indici aggiuntivi per le query del dashboard (acc_stats.db)
+--
+-- Il database è generato dal job di sincronizzazione: questo file va applicato
+-- dopo ogni rigenerazione, es. sqlite3 acc_stats.db < schema/indexes.sql
+-- Idempotente (IF NOT EXISTS). Il dashboard apre il file in sola lettura e
+-- segnala nel log gli indici mancanti, senza crearli.
+
+-- Giri validi per pilota (best lap per pista/pilota) e giri di una sessione
+CREATE INDEX IF NOT EXISTS idx_laps_driver_valid_time ON laps(driver_id, is_valid_for_best, lap_time);
+CREATE INDEX IF NOT EXISTS idx_laps_session ON laps(session_id);
+
+-- Classifiche campionato di un pilota
+CREATE INDEX IF NOT EXISTS idx_championship_standings_driver ON championship_standings(driver_id);
+
+-- Risultati di una sessione in ordine di posizione
+CREATE INDEX IF NOT EXISTS idx_session_results_session_pos ON session_results(session_id, position);
+
+-- Competizioni di un campionato per data e prossima competizione non completata
+CREATE INDEX IF NOT EXISTS idx_competitions_champ_date ON competitions(championship_id, date_start DESC);
+CREATE INDEX IF NOT EXISTS idx_competitions_open_date ON competitions(date_start) WHERE is_completed = 0;
+
+-- Trend di partecipazione: sessioni -> risultati -> piloti solo su indici coprenti
+CREATE INDEX IF NOT EXISTS idx_sessions_comp_date ON sessions(competition_id, session_date, session_id);
+CREATE INDEX IF NOT EXISTS idx_session_results_session_driver ON session_results(session_id, driver_id);
+CREATE INDEX IF NOT EXISTS idx_drivers_id_trust ON drivers(driver_id, trust_level);
+
+-- Statistiche per il planner dopo la creazione degli indici
+ANALYZE;